@@ -0,0 +1,63 @@
+"""Client for api_server.py, used by the Streamlit app when ``interview_api_url`` is set."""
+import requests
+
+from interview_session import closing_message, greeting_message
+from transcript import InterviewTranscript
+
+
+class InterviewApiClient:
+    def __init__(self, base_url, timeout=300):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        # One pooled HTTP connection per client instead of a new one per request
+        self.http = requests.Session()
+
+    def request(self, method, path, **kwargs):
+        response = self.http.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def start_interview(self, resume_file, job_file):
+        files = {"resume": resume_file.getvalue(), "job": job_file.getvalue()}
+        return self.request("POST", "/interviews", files=files)
+
+    def next_question(self, interview_id):
+        return self.request("POST", f"/interviews/{interview_id}/questions")
+
+    def submit_answer(self, interview_id, answer):
+        return self.request("POST", f"/interviews/{interview_id}/answers", json={"answer": answer})
+
+
+class RemoteInterview:
+    """InterviewSession look-alike whose turns are generated by the API server.
+
+    The transcript is mirrored locally from the server's responses, so the
+    chat window renders exactly as it does for a local session.
+    """
+
+    def __init__(self, client, state):
+        self.client = client
+        self.interview_id = state["interview_id"]
+        self.state = state
+        self.transcript = InterviewTranscript()
+        self.transcript.add_message("assistant", greeting_message)
+
+    @classmethod
+    def start(cls, client, resume_file, job_file):
+        return cls(client, client.start_interview(resume_file, job_file))
+
+    def skill_coverage(self):
+        return self.state["skill_coverage"]
+
+    def next_question(self):
+        self.state = self.client.next_question(self.interview_id)
+        question = self.state["current_question"] if self.state["awaiting_answer"] else None
+        if question:
+            self.transcript.add_question(question)
+        else:
+            self.transcript.complete(closing_message)
+        return question
+
+    def submit_answer(self, answer):
+        self.state = self.client.submit_answer(self.interview_id, answer)
+        self.transcript.add_answer(answer)
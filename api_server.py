@@ -0,0 +1,220 @@
+"""Asynchronous HTTP API for running interviews outside Streamlit.
+
+Usage: ``python api_server.py`` (host, port, session store and concurrency
+come from config.py).
+
+Endpoints:
+
+- ``POST /interviews``: start an interview. Send multipart ``resume`` and
+  ``job`` PDF files, or JSON ``{"resume_text": ..., "job_text": ...}``.
+- ``POST /interviews/{id}/questions``: generate the next question.
+- ``POST /interviews/{id}/answers``: submit ``{"answer": ...}`` to the open question.
+- ``GET /interviews/{id}``: current state of the interview.
+- ``GET /metrics``: LLM scheduler queue metrics.
+- ``GET /metrics/spans``: per-stage span totals in the Prometheus text format.
+
+Parsing and generation are blocking, so they run on a worker pool of
+``api_max_concurrency`` threads; the event loop only routes requests. All
+sessions share the compiled program, the LM client and the rate limiter.
+"""
+import asyncio
+import io
+import json
+import logging
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+from cohere.errors import TooManyRequestsError
+
+from config import api_host, api_max_concurrency, api_port, setup_logging
+from interview_session import InterviewSession
+from llm_scheduler import get_scheduler
+from program_registry import get_registry
+from session_store import create_session_store
+from tracing import tracer
+from utils import safe_parse_pdf
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def interview_state(interview_id, session):
+    transcript = session.transcript
+    return {
+        "interview_id": interview_id,
+        "questions": transcript.questions,
+        "answers": transcript.answers,
+        "current_question": transcript.current_question,
+        "awaiting_answer": transcript.awaiting_answer,
+        "completed": transcript.completed,
+        "skill_coverage": session.skill_coverage(),
+    }
+
+
+class InterviewService:
+    """Sessions, per-session locks and the worker pool behind the HTTP handlers."""
+
+    def __init__(self, store=None, max_concurrency=api_max_concurrency):
+        self.store = store or create_session_store()
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="api-worker")
+        # One lock per interview so concurrent requests for it are applied in order
+        self._locks = weakref.WeakValueDictionary()
+
+    def lock(self, interview_id):
+        lock = self._locks.get(interview_id)
+        if lock is None:
+            lock = self._locks[interview_id] = asyncio.Lock()
+        return lock
+
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def load(self, interview_id):
+        # Loading may rebuild a stored session's indexes, so it shares the bounded worker pool
+        session = await self.run(self.store.get, interview_id)
+        if session is None:
+            raise web.HTTPNotFound(text=f"No interview {interview_id}")
+        return session
+
+    async def save(self, interview_id, session):
+        await self.run(self.store.put, interview_id, session)
+
+    async def start(self, resume_text, job_text):
+        session = await self.run(InterviewSession, resume_text, job_text)
+        interview_id = uuid.uuid4().hex
+        await self.save(interview_id, session)
+        return interview_id, session
+
+    async def next_question(self, interview_id):
+        async with self.lock(interview_id):
+            session = await self.load(interview_id)
+            # A retried request gets the open question back instead of generating another one
+            if not session.transcript.completed and not session.transcript.awaiting_answer:
+                await self.run(session.next_question)
+                await self.save(interview_id, session)
+            return session
+
+    async def submit_answer(self, interview_id, answer):
+        async with self.lock(interview_id):
+            session = await self.load(interview_id)
+            try:
+                session.submit_answer(answer)
+            except ValueError as e:
+                raise web.HTTPConflict(text=str(e))
+            await self.save(interview_id, session)
+            return session
+
+
+async def read_json(request):
+    """The request's JSON object body; a malformed body is the client's error."""
+    try:
+        body = await request.json()
+    except json.JSONDecodeError as e:
+        raise web.HTTPBadRequest(text=f"Invalid JSON body: {str(e)}")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text="The JSON body must be an object")
+    return body
+
+
+def string_field(body, name):
+    """body[name] if it is a string (or missing); any other type is the client's error."""
+    value = body.get(name)
+    if value is not None and not isinstance(value, str):
+        raise web.HTTPBadRequest(text=f"{name} must be a string")
+    return value
+
+
+async def read_documents(request, service):
+    """(resume_text, job_text) from a multipart PDF upload or a JSON body of extracted text."""
+    if request.content_type == "application/json":
+        body = await read_json(request)
+        return string_field(body, "resume_text"), string_field(body, "job_text")
+    if not request.content_type.startswith("multipart/"):
+        raise web.HTTPBadRequest(text="Send the documents as multipart PDF files or a JSON body")
+
+    uploads = {}
+    try:
+        reader = await request.multipart()
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=f"Invalid multipart body: {str(e)}")
+    async for part in reader:
+        if part.name in ("resume", "job"):
+            uploads[part.name] = io.BytesIO(await part.read())
+    resume_text, job_text = await asyncio.gather(
+        service.run(safe_parse_pdf, uploads.get("resume"), "resume"),
+        service.run(safe_parse_pdf, uploads.get("job"), "job_desc"),
+    )
+    return resume_text, job_text
+
+
+async def start_interview(request):
+    service = request.app["service"]
+    resume_text, job_text = await read_documents(request, service)
+    if not resume_text or not job_text:
+        raise web.HTTPBadRequest(text="Could not read the resume or job description")
+    interview_id, session = await service.start(resume_text, job_text)
+    logger.info(f"Started interview {interview_id}")
+    return web.json_response(interview_state(interview_id, session), status=201)
+
+
+async def next_question(request):
+    interview_id = request.match_info["interview_id"]
+    try:
+        session = await request.app["service"].next_question(interview_id)
+    except TooManyRequestsError:
+        raise web.HTTPServiceUnavailable(text="Rate limit exceeded. Please try again later.", headers={"Retry-After": "30"})
+    return web.json_response(interview_state(interview_id, session))
+
+
+async def submit_answer(request):
+    interview_id = request.match_info["interview_id"]
+    answer = string_field(await read_json(request), "answer")
+    if not answer:
+        raise web.HTTPBadRequest(text="answer is required")
+    session = await request.app["service"].submit_answer(interview_id, answer)
+    return web.json_response(interview_state(interview_id, session))
+
+
+async def get_interview(request):
+    interview_id = request.match_info["interview_id"]
+    session = await request.app["service"].load(interview_id)
+    return web.json_response(interview_state(interview_id, session))
+
+
+async def metrics(request):
+    return web.json_response(get_scheduler().metrics())
+
+
+async def span_metrics(request):
+    return web.Response(text=tracer.prometheus_text(), content_type="text/plain")
+
+
+async def on_startup(app):
+    # Start loading the compiled program before the first interview needs it
+    get_registry().warm_up()
+
+
+async def on_cleanup(app):
+    app["service"].executor.shutdown(wait=False)
+
+
+def create_app(service=None):
+    app = web.Application()
+    app["service"] = service or InterviewService()
+    app.add_routes([
+        web.post("/interviews", start_interview),
+        web.get("/interviews/{interview_id}", get_interview),
+        web.post("/interviews/{interview_id}/questions", next_question),
+        web.post("/interviews/{interview_id}/answers", submit_answer),
+        web.get("/metrics", metrics),
+        web.get("/metrics/spans", span_metrics),
+    ])
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(create_app(), host=api_host, port=api_port)
@@ -0,0 +1,121 @@
+"""Offline stand-ins for Cohere and LlamaParse.
+
+Selected with ``lm_backend=stub`` and ``parser_backend=stub`` (see config.py),
+they let the whole question pipeline run without API keys, deterministically,
+with a configurable injected latency.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+
+from dsp.modules.lm import LM
+
+from context_budget import count_tokens
+from tracing import tracer
+
+format_line = re.compile(r"^([A-Z][\w ]*):(.*)$")
+
+
+def prompt_digest(prompt):
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class StubLM(LM):
+    """Deterministic LM that replays recorded completions.
+
+    Recordings map the SHA-256 of a prompt to its completion. Prompts without a
+    recording get a synthesized completion that fills every output field the
+    prompt asks for, so any DSPy signature can run against it.
+    """
+
+    def __init__(self, recordings=None, latency=0.0, model="stub"):
+        super().__init__(model)
+        self.provider = "stub"
+        self.recordings = recordings or {}
+        self.latency = latency
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        recordings = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                recordings = json.load(f)
+        return cls(recordings, **kwargs)
+
+    def synthesize(self, prompt):
+        """Fill the output fields from the prompt's 'Follow the following format.' section."""
+        digest = prompt_digest(prompt)[:8]
+        prefixes = []
+        if "Follow the following format." in prompt:
+            format_section = prompt.split("Follow the following format.", 1)[1].split("---", 1)[0]
+            for line in format_section.strip().splitlines():
+                match = format_line.match(line.strip())
+                if match:
+                    prefixes.append((match.group(1), match.group(2)))
+        last_line = prompt.rstrip().splitlines()[-1].strip() if prompt.strip() else ""
+        names = [name for name, _ in prefixes]
+        start = names.index(last_line[:-1]) if last_line.endswith(":") and last_line[:-1] in names else len(names)
+
+        parts = []
+        for position, (name, description) in enumerate(prefixes[start:]):
+            value = "Yes" if "Yes or No" in description else f"Stub {name.lower()} {digest}?"
+            parts.append(f" {value}" if position == 0 else f"{name}: {value}")
+        return "\n\n".join(parts) or f"Stub completion {digest}"
+
+    def basic_request(self, prompt, **kwargs):
+        with tracer.span("llm.request", backend="stub") as span:
+            if self.latency:
+                time.sleep(self.latency)
+            completion = self.recordings.get(prompt_digest(prompt)) or self.synthesize(prompt)
+            span.set("prompt_tokens", count_tokens(prompt))
+            span.set("completion_tokens", count_tokens(completion))
+        self.history.append({"prompt": prompt, "response": {"choices": [completion]}, "kwargs": kwargs})
+        return completion
+
+    def __call__(self, prompt, only_completed=True, return_sorted=False, **kwargs):
+        return [self.basic_request(prompt, **kwargs)]
+
+
+class StubStreamingBackend:
+    """Streams the StubLM completion for a prompt in small chunks."""
+
+    def __init__(self, lm, chunk_size=12):
+        self.lm = lm
+        self.chunk_size = chunk_size
+
+    def stream(self, prompt):
+        completion = self.lm.basic_request(prompt)
+        for start in range(0, len(completion), self.chunk_size):
+            yield completion[start:start + self.chunk_size]
+
+
+class StubDocument:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubParser:
+    """Drop-in for LlamaParse.load_data that reads pre-extracted text.
+
+    Looks for ``<sha256 of the PDF>.txt`` in the documents directory and falls
+    back to a fixed placeholder, so parsing never touches the network.
+    """
+
+    placeholder = "Stub document\n\nSkills: Python, SQL, Java, Spring Boot, JUnit, Microservices"
+
+    def __init__(self, documents_dir=None, latency=0.0):
+        self.documents_dir = documents_dir
+        self.latency = latency
+
+    def load_data(self, path):
+        if self.latency:
+            time.sleep(self.latency)
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        text_path = os.path.join(self.documents_dir or "", f"{digest}.txt")
+        if self.documents_dir and os.path.exists(text_path):
+            with open(text_path, encoding="utf-8") as f:
+                return [StubDocument(f.read())]
+        return [StubDocument(self.placeholder)]
@@ -0,0 +1,60 @@
+"""Compare the local text-layer extractor with LlamaParse.
+
+Usage: ``python -m benchmarks.extractors jobdiscr.pdf other.pdf [--json out.json]``
+
+LlamaParse output is treated as the reference text; fidelity is the similarity
+of the local output's word sequence to it.
+"""
+import argparse
+import difflib
+import json
+import os
+import time
+
+from utils import LlamaParseExtractor, LocalTextExtractor, is_acceptable_text, read_pdf_bytes
+
+
+def timed_extract(extractor, pdf_bytes):
+    start = time.perf_counter()
+    text, page_count = extractor.extract(pdf_bytes)
+    return text, page_count, time.perf_counter() - start
+
+
+def word_similarity(text, reference):
+    return difflib.SequenceMatcher(None, text.split(), reference.split(), autojunk=False).ratio()
+
+
+def benchmark_document(path):
+    pdf_bytes = read_pdf_bytes(path)
+    local_text, page_count, local_seconds = timed_extract(LocalTextExtractor(), pdf_bytes)
+    remote_text, _, remote_seconds = timed_extract(LlamaParseExtractor(), pdf_bytes)
+    return {
+        "document": os.path.basename(path),
+        "pages": page_count,
+        "local_seconds": round(local_seconds, 3),
+        "llamaparse_seconds": round(remote_seconds, 3),
+        "local_accepted": is_acceptable_text(local_text, page_count),
+        "fidelity": round(word_similarity(local_text, remote_text), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local PDF extraction against LlamaParse.")
+    parser.add_argument("pdfs", nargs="+", help="PDF files to benchmark")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = [benchmark_document(path) for path in args.pdfs]
+
+    print(f"{'document':30} {'pages':>5} {'local s':>8} {'llama s':>8} {'fidelity':>8} accepted")
+    for row in results:
+        print(f"{row['document'][:30]:30} {row['pages']:>5} {row['local_seconds']:>8} "
+              f"{row['llamaparse_seconds']:>8} {row['fidelity']:>8} {row['local_accepted']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Offline latency and memory benchmark of the question pipeline.
+
+Usage: ``python -m benchmarks.pipeline [--sessions 3] [--turns 5] [--json out.json] [--baseline base.json]``
+
+Runs against the stub LM and stub parser from backends.py (with the injected
+latency set by ``stub_latency_ms``), so results only move when our own code
+gets slower. With ``--baseline``, exits non-zero if any metric regressed by
+more than ``--tolerance``.
+"""
+import os
+import tempfile
+
+# Select the offline backends and throwaway caches before any project module reads config
+_scratch = tempfile.mkdtemp(prefix="interview-bench-")
+os.environ.setdefault("lm_backend", "stub")
+os.environ.setdefault("parser_backend", "stub")
+os.environ["compiled_module_dir"] = os.path.join(_scratch, "compiled")
+os.environ["verdict_cache_path"] = os.path.join(_scratch, "verdicts.sqlite")
+os.environ["pdf_cache_path"] = os.path.join(_scratch, "parsed_pdfs.sqlite")
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from compile_module import compile_and_save_module, create_train_example
+from generation_cache import generation_cache
+from interview_session import InterviewSession
+from program_registry import get_registry
+from question_generation import InterviewQuestionGenerator
+from trainset_store import TrainsetStore
+from utils import extractor_chain, read_pdf_bytes
+
+here = os.path.dirname(os.path.abspath(__file__))
+default_resume = os.path.join(here, "data", "sample_resume.txt")
+default_job = os.path.join(here, os.pardir, "jobdiscr.pdf")
+
+answers = [
+    "I built Spring Boot microservices at TrueLancer and scaled them behind a gateway.",
+    "I write JUnit tests first for service logic and use Mockito for the integrations.",
+    "I tuned slow SQL reports at Wipro by adding covering indexes and rewriting joins.",
+    "We split the monolith by business capability and moved one service at a time.",
+    "I use Docker for local parity and Kubernetes for rolling deployments.",
+]
+
+
+def load_text(path):
+    if path.endswith(".pdf"):
+        return extractor_chain.extract(read_pdf_bytes(path))
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def bench_compile(resume_text, job_text):
+    # Only the stored questions are needed; every example is paired with the benchmark documents
+    trainset = [
+        create_train_example(resume_text, job_text, record.previous_answers, record.previous_questions, record.question)
+        .with_inputs('resume_text', 'job_text', 'previous_answers', 'previous_questions')
+        for record in TrainsetStore().scan()[1]
+    ]
+    path = os.path.join(_scratch, "compiled", "benchmark.json")
+    start = time.perf_counter()
+    program = compile_and_save_module(InterviewQuestionGenerator(), path, trainset=trainset)
+    return program, time.perf_counter() - start
+
+
+def bench_session(resume_path, job_path, turns):
+    """Time one interview from raw documents; returns (time_to_first_question, turn latencies)."""
+    generation_cache.clear()
+    start = time.perf_counter()
+    session = InterviewSession(load_text(resume_path), load_text(job_path))
+    session.next_question()
+    first_question = time.perf_counter() - start
+
+    latencies = []
+    for turn in range(turns):
+        session.submit_answer(answers[turn % len(answers)])
+        turn_start = time.perf_counter()
+        if session.next_question() is None:
+            break
+        latencies.append(time.perf_counter() - turn_start)
+    return session, first_question, latencies
+
+
+def run_benchmark(resume_path, job_path, sessions, turns):
+    resume_text, job_text = load_text(resume_path), load_text(job_path)
+    program, compile_seconds = bench_compile(resume_text, job_text)
+    get_registry().install("benchmark", program)
+
+    first_questions, latencies, memory = [], [], []
+    for _ in range(sessions):
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        session, first_question, turn_latencies = bench_session(resume_path, job_path, turns)
+        memory.append(tracemalloc.get_traced_memory()[0] - baseline)
+        tracemalloc.stop()
+        del session
+        first_questions.append(first_question)
+        latencies.extend(turn_latencies)
+
+    return {
+        "compile_seconds": round(compile_seconds, 4),
+        "time_to_first_question_seconds": round(statistics.median(first_questions), 4),
+        "turn_latency_p50_seconds": round(statistics.median(latencies), 4) if latencies else None,
+        "turn_latency_max_seconds": round(max(latencies), 4) if latencies else None,
+        "memory_per_session_kb": round(statistics.median(memory) / 1024, 1),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    return [
+        f"{name}: {results[name]} vs baseline {value}"
+        for name, value in baseline.items()
+        if value and results.get(name) is not None and results[name] > value * (1 + tolerance)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the question pipeline against offline backends.")
+    parser.add_argument("--resume", default=default_resume, help="Resume PDF or text file")
+    parser.add_argument("--job", default=default_job, help="Job description PDF or text file")
+    parser.add_argument("--sessions", type=int, default=3, help="Interviews to run")
+    parser.add_argument("--turns", type=int, default=5, help="Questions after the first one, per interview")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown relative to the baseline")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.resume, args.job, args.sessions, args.turns)
+    for name, value in results.items():
+        print(f"{name:34} {value}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures = regressions(results, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
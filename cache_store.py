@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def cache_key(*parts):
+    """SHA-256 over the JSON encoding of the given parts."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class SqliteCache:
+    """Small persistent key/value cache shared by every thread of the process.
+
+    With ``max_bytes`` set, the least recently used entries are evicted once the
+    stored values grow past that size.
+    """
+
+    def __init__(self, path, max_bytes=None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache)")}
+        if "size" not in columns:
+            self._conn.execute("ALTER TABLE cache ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("ALTER TABLE cache ADD COLUMN last_access REAL NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            if row and self._max_bytes:
+                self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        return json.loads(row[0]) if row else default
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM cache WHERE key = ?", (key,)).fetchone() is not None
+
+    def items(self):
+        """All (key, value) pairs, without touching their last access time."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM cache").fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def set(self, key, value):
+        encoded = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, encoded, len(encoded), time.time())
+            )
+            if self._max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        rows = self._conn.execute("SELECT key, size FROM cache ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if total <= self._max_bytes:
+                break
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            total -= size
@@ -1,13 +1,72 @@
 import logging
+import threading
 from dotenv import load_dotenv
 import os
 import dspy
-from dspy import Cohere
 from cohere.errors import UnauthorizedError
-from llama_parse import LlamaParse
 
 load_dotenv()
 
+# Directory holding compiled DSPy programs, one file per trainset/config/backend hash
+compiled_module_dir = os.environ.get("compiled_module_dir", "compiled_modules")
+# Trainset store for BootstrapFewShot (see trainset_store.py), loaded on demand
+trainset_path = os.environ.get("trainset_path", os.path.join("data", "trainset.jsonl"))
+# Skill name -> aliases used by skill_index.py; a skill is covered after skill_question_limit questions
+skill_taxonomy_path = os.environ.get("skill_taxonomy_path", os.path.join("data", "skill_taxonomy.json"))
+skill_question_limit = int(os.environ.get("skill_question_limit", 3))
+# Persistent cache of metric verdicts, keyed by question, history, rubric version and LM backend
+verdict_cache_path = os.environ.get("verdict_cache_path", os.path.join("cache", "verdicts.sqlite"))
+# Persistent cache of parsed PDF text, keyed by the SHA-256 of the PDF bytes and the parser backend
+pdf_cache_path = os.environ.get("pdf_cache_path", os.path.join("cache", "parsed_pdfs.sqlite"))
+pdf_cache_max_bytes = int(os.environ.get("pdf_cache_max_mb", 256)) * 1024 * 1024
+# PDF extractors tried in order; a later one is only used when the earlier output looks low quality
+pdf_extractors = os.environ.get("pdf_extractors", "local,llamaparse").split(",")
+pdf_min_chars_per_page = int(os.environ.get("pdf_min_chars_per_page", 200))
+pdf_min_printable_ratio = float(os.environ.get("pdf_min_printable_ratio", 0.9))
+# Prompt token budgets; older Q&A turns beyond the recent window are summarized
+resume_token_budget = int(os.environ.get("resume_token_budget", 1500))
+job_token_budget = int(os.environ.get("job_token_budget", 1000))
+recent_turns = int(os.environ.get("recent_turns", 3))
+# Cohere's tokenizer for the generation model, only ever read from disk (fetch it once with
+# ``python context_budget.py fetch-tokenizer``); token counts are approximated until it exists
+tokenizer_path = os.environ.get("tokenizer_path", os.path.join("cache", "command-r-tokenizer.json"))
+# Send the top-k retrieved resume/JD chunks per turn instead of the whole documents (0 disables);
+# retrieval_model names a sentence-transformers model, otherwise TF-IDF is used
+retrieval_top_k = int(os.environ.get("retrieval_top_k", 4))
+retrieval_chunk_tokens = int(os.environ.get("retrieval_chunk_tokens", 200))
+retrieval_model = os.environ.get("retrieval_model")
+# Stream questions into the chat as they are generated; a recording replaces Cohere for offline runs
+stream_questions = os.environ.get("stream_questions", "true").lower() == "true"
+stream_recording_path = os.environ.get("stream_recording_path")
+# Generated questions kept in memory, keyed by prompt inputs and program version
+generation_cache_size = int(os.environ.get("generation_cache_size", 512))
+# Prepare the answer-independent part of the next turn while the candidate is typing
+speculative_prefetch = os.environ.get("speculative_prefetch", "false").lower() == "true"
+# Shared token bucket for all Cohere calls, sized to the account's quota
+cohere_calls_per_minute = int(os.environ.get("cohere_calls_per_minute", 20))
+cohere_burst = int(os.environ.get("cohere_burst", 5))
+# "cohere"/"llamaparse" for the real services, "stub" for the offline backends in backends.py
+lm_backend = os.environ.get("lm_backend", "cohere")
+parser_backend = os.environ.get("parser_backend", "llamaparse")
+stub_recordings_path = os.environ.get("stub_recordings_path")
+stub_documents_dir = os.environ.get("stub_documents_dir")
+stub_latency = float(os.environ.get("stub_latency_ms", 0)) / 1000
+# API server (api_server.py): session storage ("memory" or "sqlite") and concurrent generations
+session_store = os.environ.get("session_store", "memory")
+session_store_path = os.environ.get("session_store_path", os.path.join("cache", "sessions.sqlite"))
+session_cache_size = int(os.environ.get("session_cache_size", 256))
+# The memory store keeps at most session_memory_limit interviews and drops one idle for session_idle_minutes
+session_memory_limit = int(os.environ.get("session_memory_limit", 1024))
+session_idle_minutes = float(os.environ.get("session_idle_minutes", 120))
+api_host = os.environ.get("api_host", "127.0.0.1")
+api_port = int(os.environ.get("api_port", 8080))
+api_max_concurrency = int(os.environ.get("api_max_concurrency", 8))
+# When set, the Streamlit app drives interviews through the API server at this URL
+interview_api_url = os.environ.get("interview_api_url")
+# Spans (tracing.py) are appended to trace_path when set; trace_metrics_path gets Prometheus text at exit
+trace_path = os.environ.get("trace_path")
+trace_metrics_path = os.environ.get("trace_metrics_path")
+
 
 def setup_logging():
     logging.basicConfig(level=logging.INFO)
@@ -18,14 +77,58 @@ def setup_llama_parser():
     if not llama_parse_key:
         logging.error("LlamaParse API key not found in environment variables")
         raise ValueError("LlamaParse API key is missing. Please check your .env file.")
-    logging.info(f"Successfully loaded LlamaParse API key. First 5 characters: {llama_parse_key[:5]}...")
     try:
+        # Imported lazily: llama_parse pulls in llama_index, which is slow to import
+        from llama_parse import LlamaParse
         return LlamaParse(api_key=llama_parse_key, result_type="text", verbose=True)
     except Exception as e:
         logging.error(f"Error initializing LlamaParse: {str(e)}")
         raise
 
 
+def setup_parser():
+    """Return the configured PDF parser backend."""
+    if parser_backend == "stub":
+        from backends import StubParser
+        return StubParser(stub_documents_dir, latency=stub_latency)
+    return setup_llama_parser()
+
+
+def create_stub_lm():
+    from backends import StubLM
+    return StubLM.from_file(stub_recordings_path, latency=stub_latency)
+
+
+def setup_lm():
+    """Configure DSPy with the selected LM backend and return it."""
+    if lm_backend == "stub":
+        lm = create_stub_lm()
+        dspy.settings.configure(lm=lm)
+        return lm
+    return setup_cohere_client()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _singleton(name, factory):
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
+def get_lm():
+    """The process-wide LM, created and configured on first use."""
+    return _singleton("lm", setup_lm)
+
+
+def get_parser():
+    """The process-wide PDF parser, created on first use."""
+    return _singleton("parser", setup_parser)
+
+
 def setup_cohere_client():
     # Initialize cohere client api
     cohere_api_key = os.environ.get("cohere_api_key")
@@ -33,10 +136,10 @@ def setup_cohere_client():
         logging.error("Cohere API key not found in environment variables")
         raise ValueError("Cohere API key is missing. Please check your .env file.")
 
-    logging.info(f"Cohere API key loaded. First 5 characters: {cohere_api_key[:5]}...")
-
     try:
-        coh = Cohere(model='command-r', api_key=cohere_api_key)
+        # Imported here because llm_scheduler reads its quota settings from this module
+        from llm_scheduler import ScheduledCohere
+        coh = ScheduledCohere(model='command-r', api_key=cohere_api_key)
         dspy.settings.configure(lm=coh)
         logging.info("Cohere client initialized successfully")
         return coh
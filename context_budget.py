@@ -0,0 +1,203 @@
+import argparse
+import functools
+import logging
+import math
+import os
+import re
+
+import dspy
+import requests
+from tokenizers import Tokenizer
+
+from config import get_lm, setup_logging, tokenizer_path
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+word_pattern = re.compile(r"[a-z][a-z0-9+#.]{2,}")
+stop_words = frozenset("""
+and the for with you your are our will from that this have has was were who what when where which
+their they them into about over able must should can all any not but also such other more than
+""".split())
+
+
+class ApproximateEncoding:
+    """Word/punctuation tokenizer used until the model's tokenizer file has been fetched."""
+    pattern = re.compile(r"\s*\w+|\s*[^\w\s]|\s+$")
+
+    def encode(self, text):
+        return self.pattern.findall(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+class ModelEncoding:
+    """The generation model's own tokenizer, loaded from a local Hugging Face tokenizer file."""
+
+    def __init__(self, path):
+        self.tokenizer = Tokenizer.from_file(path)
+
+    def encode(self, text):
+        return self.tokenizer.encode(text, add_special_tokens=False).ids
+
+    def decode(self, tokens):
+        return self.tokenizer.decode(tokens)
+
+
+@functools.lru_cache(maxsize=1)
+def get_encoding():
+    # Never downloads: token counting runs while an interview is starting
+    if os.path.exists(tokenizer_path):
+        try:
+            return ModelEncoding(tokenizer_path)
+        except Exception as e:
+            logger.warning(f"Could not load the tokenizer at {tokenizer_path}: {str(e)}")
+    else:
+        logger.info(f"No tokenizer at {tokenizer_path}, approximating token counts")
+    return ApproximateEncoding()
+
+
+def fetch_tokenizer(path=tokenizer_path, timeout=60):
+    """Download the Cohere tokenizer of the configured model to path."""
+    lm = get_lm()
+    model = lm.kwargs["model"]
+    tokenizer_url = lm.co.models.get(model).tokenizer_url
+    if not tokenizer_url:
+        raise ValueError(f"Cohere publishes no tokenizer for {model}")
+    response = requests.get(tokenizer_url, timeout=timeout)
+    response.raise_for_status()
+    # Check that the file parses before it replaces a working one
+    Tokenizer.from_str(response.text)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(response.text)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved the {model} tokenizer to {path}")
+
+
+def count_tokens(text):
+    """Number of model tokens in text."""
+    return len(get_encoding().encode(text or ""))
+
+
+def truncate_tokens(text, max_tokens):
+    tokens = get_encoding().encode(text)
+    return get_encoding().decode(tokens[:max_tokens])
+
+
+def terms(text):
+    return {w.strip(".") for w in word_pattern.findall(text.lower())} - stop_words
+
+
+def split_sections(text):
+    """Split a parsed document into sections, keeping short heading lines with their body."""
+    sections = []
+    pending_heading = ""
+    for block in re.split(r"\n\s*\n", text):
+        block = block.strip()
+        if not block:
+            continue
+        if "\n" not in block and len(block) < 60:
+            pending_heading = f"{pending_heading}\n{block}".strip()
+            continue
+        sections.append(f"{pending_heading}\n{block}".strip())
+        pending_heading = ""
+    if pending_heading:
+        sections.append(pending_heading)
+    return sections
+
+
+def fit_to_budget(text, max_tokens, query=""):
+    """Keep the sections of text most relevant to query within max_tokens, in document order.
+
+    Unlike cutting at a fixed word count, this keeps relevant sections that sit at
+    the end of the document, such as a skills section at the bottom of a resume.
+    """
+    if not text or count_tokens(text) <= max_tokens:
+        return text or ""
+
+    sections = split_sections(text)
+    query_terms = terms(query)
+
+    def relevance(section):
+        section_terms = terms(section)
+        if not section_terms:
+            return 0.0
+        return len(section_terms & query_terms) / math.sqrt(len(section_terms))
+
+    ranked = sorted(range(len(sections)), key=lambda i: relevance(sections[i]), reverse=True)
+    selected = {}
+    remaining = max_tokens
+    for index in ranked:
+        size = count_tokens(sections[index])
+        if size <= remaining:
+            selected[index] = sections[index]
+            remaining -= size
+        elif remaining > 50:
+            selected[index] = truncate_tokens(sections[index], remaining)
+            remaining = 0
+        if remaining <= 0:
+            break
+
+    logger.debug(f"Kept {len(selected)} of {len(sections)} sections within {max_tokens} tokens")
+    return "\n\n".join(selected[i] for i in sorted(selected))
+
+
+class SummarizeInterview(dspy.Signature):
+    """Fold the latest interview turn into a running summary of the interview."""
+    summary = dspy.InputField(desc="Summary of the interview so far")
+    question = dspy.InputField(desc="Question asked in the latest turn")
+    answer = dspy.InputField(desc="Candidate's answer to that question")
+    updated_summary = dspy.OutputField(desc="Concise summary of the skills covered and what the candidate said about each")
+
+
+class HistoryCompactor:
+    """Keep the last few turns verbatim and an incrementally updated summary of the rest.
+
+    Each turn is summarized once, when it ages out of the recent window, so the
+    prompt stays roughly the same size however long the interview runs.
+    """
+
+    def __init__(self, recent_turns=3, max_summary_tokens=300):
+        self.recent_turns = recent_turns
+        self.max_summary_tokens = max_summary_tokens
+        self.summary = ""
+        self.summarized_turns = 0
+
+    def fold_turn(self, question, answer):
+        with dspy.context(lm=get_lm()):
+            result = dspy.Predict(SummarizeInterview)(summary=self.summary, question=question, answer=answer)
+        self.summary = truncate_tokens(result.updated_summary.strip(), self.max_summary_tokens)
+        self.summarized_turns += 1
+
+    def fold_older_turns(self, previous_questions, previous_answers):
+        """Summarize the turns that have left the recent window; return how many were folded."""
+        older_turns = max(len(previous_questions) - self.recent_turns, 0)
+        folded = 0
+        while self.summarized_turns < older_turns:
+            turn = self.summarized_turns
+            answer = previous_answers[turn] if turn < len(previous_answers) else ""
+            self.fold_turn(previous_questions[turn], answer)
+            folded += 1
+        return folded
+
+    def compact(self, previous_questions, previous_answers):
+        """Return (summary, recent_questions, recent_answers) for the next prompt."""
+        self.fold_older_turns(previous_questions, previous_answers)
+        older_turns = max(len(previous_questions) - self.recent_turns, 0)
+        return self.summary, previous_questions[older_turns:], previous_answers[older_turns:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the tokenizer used for prompt token budgets.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fetch = commands.add_parser("fetch-tokenizer", help="Download the Cohere tokenizer of the configured model")
+    fetch.add_argument("--path", default=tokenizer_path, help="Where to save the tokenizer file")
+    args = parser.parse_args()
+    fetch_tokenizer(args.path)
+
+
+if __name__ == "__main__":
+    main()
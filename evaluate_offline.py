@@ -0,0 +1,103 @@
+"""Offline evaluation of the compiled question generator.
+
+Run once with ``python evaluate_offline.py`` or keep it scoring on a schedule
+with ``--interval``. Nothing here is called from the interview request path.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+import dspy
+
+from config import setup_logging
+from compile_module import load_trainset, metric
+from program_registry import get_registry
+from llm_scheduler import Lane, get_scheduler
+from tracing import tracer
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class TimedProgram:
+    """Wrap a program so each prediction carries its own latency.
+
+    Evaluate calls this from its worker threads, so the background lane is set
+    per call rather than around the whole evaluation.
+    """
+
+    def __init__(self, program):
+        self.program = program
+
+    def __call__(self, **kwargs):
+        with get_scheduler().lane(Lane.BACKGROUND):
+            start = time.perf_counter()
+            prediction = self.program(**kwargs)
+        prediction.latency = time.perf_counter() - start
+        return prediction
+
+
+def run_evaluation(report_path, num_threads=4, devset=None):
+    devset = load_trainset() if devset is None else devset
+    registry = get_registry()
+    evaluator = dspy.evaluate.Evaluate(
+        devset=devset,
+        num_threads=num_threads,
+        display_progress=True,
+        display_table=0
+    )
+
+    program = TimedProgram(registry.get_program())
+    started = time.perf_counter()
+    with tracer.span("evaluate", examples=len(devset), threads=num_threads) as span:
+        score, results = evaluator(program, metric, return_outputs=True)
+        span.set("score", score)
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "program_version": registry.version,
+        "num_threads": num_threads,
+        "average_score": score,
+        "total_seconds": round(elapsed, 3),
+        "scheduler": get_scheduler().metrics(),
+        "spans": tracer.summary(),
+        "examples": [
+            {
+                "index": index,
+                "score": example_score,
+                "latency_seconds": round(prediction.get("latency", 0.0), 3),
+                "question": prediction.get("question"),
+            }
+            for index, (example, prediction, example_score) in enumerate(results)
+        ],
+    }
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Evaluation score {score} written to {report_path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score the compiled interview question generator.")
+    parser.add_argument("--report", default=os.path.join("reports", "evaluation.json"),
+                        help="Where to write the scored results")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("eval_num_threads", 4)),
+                        help="Number of examples evaluated in parallel")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="Re-run every N minutes; 0 runs a single evaluation")
+    args = parser.parse_args()
+
+    while True:
+        run_evaluation(args.report, args.threads)
+        if not args.interval:
+            break
+        time.sleep(args.interval * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import threading
+
+from cachetools import LRUCache
+
+from cache_store import cache_key
+from config import generation_cache_size
+
+
+class GenerationCache:
+    """Bounded, thread-safe LRU cache of generated (question, rationale) pairs.
+
+    Keys cover everything the prompt is built from plus the program version, so
+    an entry can safely be shared between sessions: two sessions only hit the
+    same entry when the model would have been sent the same request.
+    """
+
+    def __init__(self, maxsize):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def key(self, program_version, resume_text, job_text, previous_questions, previous_answers, history_summary=""):
+        return cache_key(program_version, resume_text, job_text,
+                         list(previous_questions), list(previous_answers), history_summary)
+
+    def get(self, key):
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key, question, rationale):
+        with self._lock:
+            self._cache[key] = (question, rationale)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+generation_cache = GenerationCache(generation_cache_size)
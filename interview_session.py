@@ -0,0 +1,100 @@
+from config import job_token_budget, recent_turns, resume_token_budget, retrieval_top_k
+from context_budget import HistoryCompactor, fit_to_budget
+from rate_limit_generate_question import rate_limited_generate_question
+from retrieval import ChunkIndex
+from skill_index import SkillIndex
+from transcript import InterviewTranscript
+
+closing_message = "Thank you for completing the interview. Let me know if you have any questions!"
+greeting_message = "Hello! I'm your AI interviewer today. Let's begin with the first question."
+
+
+class InterviewSession:
+    """One candidate's interview, independent of how it is presented.
+
+    Holds the budgeted resume/JD text, the chunk index, the transcript, the
+    history compactor and the skill coverage index, and turns them into
+    generator inputs. The Streamlit app, the batch simulator and the API all
+    drive interviews through this class.
+    """
+
+    def __init__(self, resume_text, job_text, transcript=None):
+        self.documents = {"resume": resume_text, "job": job_text}
+        # Each document is compacted with the other one as the relevance query
+        self.resume_text = fit_to_budget(resume_text, resume_token_budget, query=job_text)
+        self.job_text = fit_to_budget(job_text, job_token_budget, query=resume_text)
+        self.history_compactor = HistoryCompactor(recent_turns=recent_turns)
+        # Built from the full documents, so skills cut by the token budget are still known
+        self.skill_index = SkillIndex(job_text, resume_text)
+        self.chunk_index = ChunkIndex.from_documents(self.documents) if retrieval_top_k else None
+        if transcript is None:
+            transcript = InterviewTranscript()
+            transcript.add_message("assistant", greeting_message)
+        self.transcript = transcript
+        for question in transcript.questions:
+            self.skill_index.add_question(question)
+
+    def to_dict(self):
+        """JSON-serializable state; the indexes are rebuilt from the documents by from_dict."""
+        return {
+            "documents": self.documents,
+            "transcript": self.transcript.to_dict(),
+            "history_summary": self.history_compactor.summary,
+            "summarized_turns": self.history_compactor.summarized_turns,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        session = cls(state["documents"]["resume"], state["documents"]["job"],
+                      InterviewTranscript.from_dict(state["transcript"]))
+        session.history_compactor.summary = state["history_summary"]
+        session.history_compactor.summarized_turns = state["summarized_turns"]
+        return session
+
+    def skill_coverage(self):
+        return self.skill_index.coverage()
+
+    def retrieval_query(self):
+        """The skill being probed, the next uncovered job skill and the last answer."""
+        questions, answers = self.transcript.questions, self.transcript.answers
+        if not questions:
+            return " ".join(self.skill_index.job_skills)
+        parts = [
+            self.skill_index.current_skill(questions[-1]),
+            next(iter(self.skill_index.uncovered_skills()), None),
+            answers[-1] if answers else None,
+        ]
+        return " ".join(part for part in parts if part)
+
+    def document_context(self):
+        """Resume and job text for the next prompt: the retrieved chunks, or the budgeted documents."""
+        if self.chunk_index is None:
+            return self.resume_text, self.job_text
+        query = self.retrieval_query()
+        resume_context = self.chunk_index.search(query, "resume", retrieval_top_k) or self.resume_text
+        job_context = self.chunk_index.search(query, "job", retrieval_top_k) or self.job_text
+        return resume_context, job_context
+
+    def generation_inputs(self):
+        history_summary, recent_questions, recent_answers = self.history_compactor.compact(
+            self.transcript.questions, self.transcript.answers
+        )
+        return (*self.document_context(), recent_questions, recent_answers, history_summary)
+
+    def record_question(self, question):
+        if question:
+            self.transcript.add_question(question)
+            self.skill_index.add_question(question)
+        else:
+            self.transcript.complete(closing_message)
+
+    def next_question(self):
+        """Generate, record and return the next question; None once the interview is over."""
+        question, rationale = rate_limited_generate_question(*self.generation_inputs())
+        self.record_question(question)
+        return question
+
+    def submit_answer(self, answer):
+        if not self.transcript.awaiting_answer:
+            raise ValueError("There is no open question to answer")
+        self.transcript.add_answer(answer)
@@ -0,0 +1,211 @@
+"""Process-wide scheduler for Cohere calls.
+
+Every LLM request takes a token from one shared bucket sized to the Cohere
+quota. Waiting requests are served by lane, so interactive question generation
+goes ahead of background evaluation and compilation, and a 429 that still gets
+through is retried with jittered exponential backoff.
+"""
+import contextlib
+import heapq
+import itertools
+import logging
+import multiprocessing
+import random
+import threading
+import time
+from enum import IntEnum
+
+from cohere.errors import TooManyRequestsError
+from dspy import Cohere
+
+from config import cohere_burst, cohere_calls_per_minute
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class Lane(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class TokenBucket:
+    def __init__(self, calls_per_minute, burst):
+        self.rate = calls_per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Take a token and return 0, or return the seconds until one is available."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def drain(self):
+        """Empty the bucket after a 429 so every caller slows down, not just the one that was throttled."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+
+class SharedTokenBucket(TokenBucket):
+    """TokenBucket whose state lives in shared memory, so worker processes draw from one quota.
+
+    Create it in the parent, with the multiprocessing context the pool uses,
+    and hand it to each worker through the pool initializer.
+    """
+
+    def __init__(self, calls_per_minute, burst, context=None):
+        self.rate = calls_per_minute / 60.0
+        self.capacity = burst
+        self._state = (context or multiprocessing).Array("d", [float(burst), time.monotonic()])
+        self._lock = self._state.get_lock()
+
+    @property
+    def tokens(self):
+        return self._state[0]
+
+    @tokens.setter
+    def tokens(self, value):
+        self._state[0] = value
+
+    @property
+    def updated(self):
+        return self._state[1]
+
+    @updated.setter
+    def updated(self, value):
+        self._state[1] = value
+
+
+class LLMScheduler:
+    def __init__(self, bucket, max_retries=4, base_backoff=2.0, max_backoff=60.0):
+        self.bucket = bucket
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._local = threading.local()
+        self._stats = {lane: {"count": 0, "total_wait": 0.0, "max_wait": 0.0} for lane in Lane}
+        self._throttled = 0
+
+    @contextlib.contextmanager
+    def lane(self, lane):
+        """Run the calls made by this thread inside the block in the given lane."""
+        previous = getattr(self._local, "lane", Lane.INTERACTIVE)
+        self._local.lane = lane
+        try:
+            yield
+        finally:
+            self._local.lane = previous
+
+    def current_lane(self):
+        return getattr(self._local, "lane", Lane.INTERACTIVE)
+
+    def acquire(self, lane=None):
+        """Block until this caller is first in line and the bucket has a token."""
+        lane = self.current_lane() if lane is None else lane
+        ticket = (int(lane), next(self._sequence))
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                if self._waiting[0] == ticket:
+                    wait = self.bucket.try_acquire()
+                    if wait == 0:
+                        heapq.heappop(self._waiting)
+                        self._cond.notify_all()
+                        break
+                    self._cond.wait(timeout=wait)
+                else:
+                    self._cond.wait()
+            waited = time.monotonic() - started
+            stats = self._stats[lane]
+            stats["count"] += 1
+            stats["total_wait"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+        return waited
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+
+    def call(self, fn, *args, lane=None, **kwargs):
+        """Call fn once a token is available, retrying 429s with jittered backoff."""
+        span = tracer.current()
+        for attempt in range(self.max_retries):
+            waited = self.acquire(lane)
+            if span is not None:
+                span.add("queue_wait_seconds", waited)
+            try:
+                return fn(*args, **kwargs)
+            except TooManyRequestsError:
+                with self._cond:
+                    self._throttled += 1
+                self.bucket.drain()
+                if attempt == self.max_retries - 1:
+                    raise
+                if span is not None:
+                    span.add("retries")
+                wait_time = self.backoff(attempt)
+                logger.warning(f"Rate limit reached. Retrying in {wait_time:.1f} seconds.")
+                with tracer.span("llm.retry_sleep", attempt=attempt + 1):
+                    time.sleep(wait_time)
+
+    def metrics(self):
+        """Queue depth per lane and how long calls waited for a token."""
+        with self._cond:
+            depth = {lane.name.lower(): 0 for lane in Lane}
+            for lane, _ in self._waiting:
+                depth[Lane(lane).name.lower()] += 1
+            waits = {
+                lane.name.lower(): {
+                    "calls": stats["count"],
+                    "mean_wait_seconds": stats["total_wait"] / stats["count"] if stats["count"] else 0.0,
+                    "max_wait_seconds": stats["max_wait"],
+                }
+                for lane, stats in self._stats.items()
+            }
+            return {"queue_depth": depth, "wait": waits, "throttled": self._throttled}
+
+
+class ScheduledCohere(Cohere):
+    """Cohere LM whose requests all go through the shared scheduler."""
+
+    def basic_request(self, prompt, **kwargs):
+        with tracer.span("llm.request", backend="cohere") as span:
+            response = get_scheduler().call(super().basic_request, prompt, **kwargs)
+            # Token counts as billed by Cohere, when the response reports them
+            billed = getattr(getattr(response, "meta", None), "billed_units", None)
+            if billed is not None:
+                span.set("prompt_tokens", billed.input_tokens or 0)
+                span.set("completion_tokens", billed.output_tokens or 0)
+            return response
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(TokenBucket(cohere_calls_per_minute, cohere_burst))
+        return _scheduler
+
+
+def use_shared_bucket(bucket):
+    """Make this process's scheduler draw from a bucket shared with other processes."""
+    get_scheduler().bucket = bucket
@@ -1,7 +1,16 @@
+import itertools
+import time
 import streamlit as st
-from rate_limit_generate_question import rate_limited_generate_question
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from rate_limit_generate_question import rate_limited_generate_question, stream_generate_question
 import logging
-from utils import truncate_text, safe_parse_pdf
+from utils import safe_parse_pdf
+from config import interview_api_url, speculative_prefetch, stream_questions
+from program_registry import get_registry
+from llm_scheduler import get_scheduler
+from prefetch import TurnPrefetcher, prefetch_stats
+from interview_session import InterviewSession
+from api_client import InterviewApiClient, RemoteInterview
 
 st.set_page_config(page_title="AI Interview Assistant", layout="wide")
 
@@ -9,87 +18,167 @@ st.set_page_config(page_title="AI Interview Assistant", layout="wide")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# In thin-client mode the API server generates the questions; otherwise start
+# loading the compiled program before the first interview needs it
+@st.cache_resource
+def get_api_client():
+    """One client per process, so its pooled HTTP connection survives reruns."""
+    return InterviewApiClient(interview_api_url)
+
+api_client = get_api_client() if interview_api_url else None
+if api_client is None:
+    get_registry().warm_up()
+
+@st.cache_resource
+def get_parse_executor():
+    """Shared by all sessions and reruns; parses of one interview run side by side."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="interview-start")
+
+# Messages rendered as chat bubbles; older ones are shown as one pre-built block
+chat_window = 6
 
 
 def initialize_session_state():
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
-    if 'current_question' not in st.session_state:
-        st.session_state.current_question = None
     if 'interview_started' not in st.session_state:
         st.session_state.interview_started = False
-    if 'interview_completed' not in st.session_state:
-        st.session_state.interview_completed = False
-    if 'waiting_for_answer' not in st.session_state:
-        st.session_state.waiting_for_answer = False
 
 
 
+def parse_documents(resume, job_desc):
+    """Parse both uploads concurrently, reporting progress per document as each one finishes."""
+    documents = {"resume": ("Resume", resume), "job_desc": ("Job description", job_desc)}
+    progress = {}
+    futures = {}
+    for file_type, (label, uploaded_file) in documents.items():
+        progress[file_type] = st.empty()
+        progress[file_type].info(f"Parsing {label.lower()}...")
+        futures[get_parse_executor().submit(safe_parse_pdf, uploaded_file, file_type)] = file_type
+
+    parsed = {}
+    for future in as_completed(futures):
+        file_type = futures[future]
+        label = documents[file_type][0]
+        parsed[file_type] = future.result()
+        if parsed[file_type]:
+            progress[file_type].success(f"{label} parsed")
+        else:
+            progress[file_type].error(f"Could not parse the {label.lower()}")
+    return parsed["resume"], parsed["job_desc"]
+
+def start_remote_interview(resume, job_desc):
+    """Start the interview on the API server, which parses the uploads itself."""
+    try:
+        with st.spinner("Starting interview..."):
+            st.session_state.interview = RemoteInterview.start(api_client, resume, job_desc)
+        st.session_state.interview_started = True
+    except Exception as e:
+        logger.error(f"Could not start the interview on {interview_api_url}: {str(e)}")
+        st.error("Failed to start the interview. Please try again.")
+
 def start_interview(resume, job_desc):
-    with st.spinner(f"Parsing ..."):
-        resume = safe_parse_pdf(resume, "resume")
-        job_desc = safe_parse_pdf(job_desc, "job_desc")
-        st.session_state.parsed_resume = truncate_text(resume)
-        st.session_state.parsed_job_desc = truncate_text(job_desc)
-    
-    if st.session_state.parsed_resume and st.session_state.parsed_job_desc:
+    if api_client is not None:
+        start_remote_interview(resume, job_desc)
+        return
+    # The program load overlaps with the parses; get_program retries a load that failed earlier
+    program_loading = get_parse_executor().submit(get_registry().get_program)
+    resume, job_desc = parse_documents(resume, job_desc)
+
+    if resume and job_desc:
+        try:
+            with st.spinner("Loading question generator..."):
+                program_loading.result()
+        except Exception as e:
+            logger.error(f"Could not load the question generator: {str(e)}")
+            st.error("Failed to load the question generator. Please try again.")
+            return
+        st.session_state.interview = InterviewSession(resume, job_desc)
+        st.session_state.prefetcher = TurnPrefetcher()
+        # The first question is generated by display_chat_interface, streamed when enabled
         st.session_state.interview_started = True
-        st.session_state.chat_history.append(("assistant", "Hello! I'm your AI interviewer today. Let's begin with the first question."))
-        generate_next_question()
     else:
         st.error("Failed to parse uploaded files. Please try again.")
 
-@st.cache_data(ttl=3600, max_entries=9)
-def generate_next_question():
-    previous_questions = [q.split("Q: ", 1)[1] for q, _ in st.session_state.chat_history if q.startswith("Q:")]
-    previous_answers = [a for _, a in st.session_state.chat_history if not a.startswith("Q:")]
-    
-    # Join previous_questions into a single string
-    previous_questions_str = "\n".join(previous_questions) if previous_questions else ""
-    # Join previous_answers into a single string
-    previous_answers_str = "\n".join(previous_answers) if previous_answers else ""
-
-    logger.debug(f"Previous questions (string): {previous_questions_str}")
-    logger.debug(f"Previous answers (string): {previous_answers_str}")
+def generation_inputs():
+    interview = st.session_state.interview
+    # Picks up the history summary prepared while the candidate was answering, if any
+    st.session_state.prefetch_hit = (
+        speculative_prefetch and st.session_state.prefetcher.take(len(interview.transcript.questions))
+    )
+    return interview.generation_inputs()
+
+def start_prefetch():
+    """Fold turns leaving the recent window into the summary before the answer arrives."""
+    interview = st.session_state.interview
+    # Copies, so the background work never sees the answer being appended
+    st.session_state.prefetcher.start(
+        len(interview.transcript.questions),
+        interview.history_compactor.fold_older_turns,
+        list(interview.transcript.questions),
+        list(interview.transcript.answers)
+    )
+
+def record_question(question):
+    answered_at = st.session_state.pop("answered_at", None)
+    if answered_at is not None:
+        prefetch_stats.record_latency(time.perf_counter() - answered_at, st.session_state.get("prefetch_hit", False))
+    st.session_state.interview.record_question(question)
+    if question and speculative_prefetch:
+        start_prefetch()
 
+def generate_next_question():
+    if api_client is not None:
+        st.session_state.interview.next_question()
+        return
     try:
-        question, rationale = rate_limited_generate_question(
-            st.session_state.parsed_resume,
-            st.session_state.parsed_job_desc,
-            previous_questions,
-            previous_answers
-        )
+        question, rationale = rate_limited_generate_question(*generation_inputs())
         logger.debug(f"Generated question: {question}")
         logger.debug(f"Generated rationale: {rationale}")
     except Exception as e:
         logger.error(f"Error in rate_limited_generate_question: {str(e)}")
         raise
 
-    if question:
-        st.session_state.current_question = f"Q: {question}"
-        st.session_state.chat_history.append(("assistant", st.session_state.current_question))
-        st.session_state.waiting_for_answer = True
-    else:
-        st.session_state.interview_completed = True
-        st.session_state.chat_history.append(("assistant", "Thank you for completing the interview. Let me know if you have any questions!"))
+    record_question(question)
+
+def stream_next_question():
+    """Render the next question in the chat as it is generated, then record it."""
+    inputs = generation_inputs()
+    with st.chat_message("assistant"):
+        try:
+            stream = stream_generate_question(*inputs)
+            st.write_stream(itertools.chain(["Q: "], stream))
+            question = stream.question
+            logger.debug(f"Generated rationale: {stream.rationale}")
+        except Exception as e:
+            logger.warning(f"Streaming question failed, falling back to a blocking call: {str(e)}")
+            question, rationale = rate_limited_generate_question(*inputs)
+
+    record_question(question)
 
 def display_chat_interface():
     st.write("### Interview Chat")
-    
-    for role, message in st.session_state.chat_history:
+    transcript = st.session_state.interview.transcript
+
+    live_messages = transcript.live_messages(chat_window)
+    if transcript.archived_markdown:
+        with st.expander(f"Earlier in the interview ({transcript.archived_count} messages)"):
+            st.markdown(transcript.archived_markdown)
+    for role, message in live_messages:
         with st.chat_message(role):
             st.write(message)
 
-    if not st.session_state.interview_completed:
-        if st.session_state.waiting_for_answer:
+    if not transcript.completed:
+        if transcript.awaiting_answer:
             user_response = st.chat_input("Your answer")
             if user_response:
-                st.session_state.chat_history.append(("human", user_response))
-                st.session_state.waiting_for_answer = False
+                st.session_state.interview.submit_answer(user_response)
+                st.session_state.answered_at = time.perf_counter()
                 st.rerun()
         else:
-            with st.spinner("Generating next question..."):
-                generate_next_question()
+            if stream_questions and api_client is None:
+                stream_next_question()
+            else:
+                with st.spinner("Generating next question..."):
+                    generate_next_question()
             st.rerun()
     else:
         if st.button("Start New Interview"):
@@ -111,6 +200,15 @@ def main():
             if st.button("Start Interview"):
                 start_interview(uploaded_resume, uploaded_job_desc)
 
+        with st.expander("LLM queue"):
+            st.json(get_scheduler().metrics())
+        if st.session_state.interview_started:
+            with st.expander("Skill coverage"):
+                st.json(st.session_state.interview.skill_coverage())
+        if speculative_prefetch:
+            with st.expander("Prefetch"):
+                st.json(prefetch_stats.snapshot())
+
     if st.session_state.interview_started:
         display_chat_interface()
 
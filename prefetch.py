@@ -0,0 +1,80 @@
+"""Speculative preparation of the next interview turn.
+
+While the candidate is answering, the parts of the next turn that do not
+depend on the answer (currently the summary of turns leaving the recent
+window) are computed in the background and picked up when the answer arrives.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="turn-prefetch")
+
+
+class PrefetchStats:
+    """Process-wide hit rate and answer-to-question latency, split by whether prefetch was used."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.latencies = {"prefetched": [], "cold": []}
+
+    def record_lookup(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_latency(self, seconds, prefetched):
+        with self._lock:
+            self.latencies["prefetched" if prefetched else "cold"].append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "mean_answer_to_question_seconds": {
+                    kind: sum(values) / len(values) if values else None
+                    for kind, values in self.latencies.items()
+                },
+            }
+
+
+prefetch_stats = PrefetchStats()
+
+
+class TurnPrefetcher:
+    """Holds at most one speculative computation for a session, tagged with the state it was made for."""
+
+    def __init__(self):
+        self._key = None
+        self._future = None
+
+    def start(self, key, fn, *args):
+        self._key = key
+        self._future = prefetch_executor.submit(fn, *args)
+
+    def take(self, key):
+        """Wait for any pending work and return True if it was made for key and did something.
+
+        The work counts as done when it returns a truthy value, such as the
+        number of turns it folded, so a prefetch that found nothing to do is
+        not reported as a hit.
+        """
+        future, self._future = self._future, None
+        hit = False
+        if future is not None:
+            # Always wait: the speculative work may mutate session state the caller is about to use
+            try:
+                hit = bool(future.result()) and self._key == key
+            except Exception as e:
+                logger.warning(f"Speculative prefetch failed: {str(e)}")
+        prefetch_stats.record_lookup(hit)
+        return hit
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import compiled_module_dir, lm_backend, parser_backend, setup_logging, trainset_path
+from compile_module import bootstrap_config, compile_and_save_module
+from question_generation import GenerateInterviewQuestion, InterviewQuestionGenerator
+from llm_scheduler import Lane, get_scheduler
+from trainset_store import TrainsetStore
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def program_key(trainset, config):
+    """Content hash of the trainset, bootstrap config, signature and backends the program is compiled from.
+
+    With trainset None the key covers the trainset store's file and document
+    bytes, so an already compiled program is found without parsing the documents.
+    """
+    digest = hashlib.sha256()
+    # A program bootstrapped by the stub backends must never be loaded by a real run
+    digest.update(json.dumps([lm_backend, parser_backend]).encode("utf-8"))
+    digest.update((GenerateInterviewQuestion.__doc__ or "").encode("utf-8"))
+    digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+    if trainset is None:
+        digest.update(TrainsetStore(trainset_path).fingerprint().encode("utf-8"))
+    else:
+        for example in trainset:
+            digest.update(json.dumps(example.toDict(), sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class CompiledProgramRegistry:
+    """Process-wide holder of the compiled question generator.
+
+    The program is loaded (or compiled) once and shared by every session. A
+    background recompile builds the replacement on a worker thread and swaps it
+    in atomically, so callers keep using the current program until then.
+    """
+
+    def __init__(self, trainset, config, module_dir=compiled_module_dir):
+        self._trainset = trainset
+        self._config = config
+        self._module_dir = module_dir
+        self._lock = threading.Lock()
+        self._program = None
+        self._key = None
+        self._loading = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="program-compile")
+
+    @property
+    def version(self):
+        return self._key
+
+    def module_path(self, key):
+        return os.path.join(self._module_dir, f"compiled_interview_module_{key}.json")
+
+    def _build(self, trainset, config):
+        # A None trainset is only loaded by compile_and_save_module if the program is not on disk yet
+        key = program_key(trainset, config)
+        logger.info(f"Loading compiled program {key}")
+        with get_scheduler().lane(Lane.BACKGROUND):
+            program = compile_and_save_module(InterviewQuestionGenerator(), self.module_path(key), config,
+                                             trainset=trainset)
+        return key, program
+
+    def install(self, key, program, replace=True):
+        """Make program the live program under version key."""
+        with self._lock:
+            if not replace and self._program is not None:
+                return
+            self._program, self._key = program, key
+        logger.info(f"Compiled program {key} is live")
+
+    def warm_up(self):
+        """Start loading the program in the background if it is not loaded yet.
+
+        A load that failed is started again, so a transient error is not
+        replayed to every later caller.
+        """
+        with self._lock:
+            failed = self._loading is not None and self._loading.done() and self._loading.exception() is not None
+            if self._loading is None or failed:
+                self._loading = self._executor.submit(self._build, self._trainset, self._config)
+            return self._loading
+
+    def get_program(self):
+        """Return the live compiled program, loading it on first use."""
+        program = self._program
+        if program is None:
+            loading = self.warm_up()
+            try:
+                key, program = loading.result()
+            except Exception:
+                # Let the next caller retry instead of replaying the failure forever
+                with self._lock:
+                    if self._loading is loading:
+                        self._loading = None
+                raise
+            self.install(key, program, replace=False)
+            program = self._program
+        return program
+
+    def recompile_async(self, trainset=None, config=None):
+        """Rebuild the program from a new trainset/config without blocking callers."""
+        trainset = self._trainset if trainset is None else trainset
+        config = self._config if config is None else config
+
+        def done(future):
+            if future.exception() is not None:
+                logger.error(f"Background recompile failed: {future.exception()}")
+                return
+            self.install(*future.result())
+            self._trainset, self._config = trainset, config
+
+        future = self._executor.submit(self._build, trainset, config)
+        future.add_done_callback(done)
+        return future
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            # The trainset is loaded by the first build, not when the registry is created
+            _registry = CompiledProgramRegistry(None, bootstrap_config)
+        return _registry
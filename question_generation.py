@@ -1,21 +1,11 @@
 import dspy
-from dspy import Cohere
-from dspy.teleprompt import BootstrapFewShot
-import streamlit as st
-from cohere.errors import TooManyRequestsError, BadRequestError, UnauthorizedError
-import time
 import logging
-from config import setup_cohere_client, setup_llama_parser, setup_logging
-from utils import truncate_text
-from pydantic import BaseModel, Field
-from typing import List, Tuple, Optional
+from config import get_lm, setup_logging
+from tracing import tracer
 from dspy import InputField, OutputField
 
 
-setup_cohere_client()
 setup_logging()
-setup_llama_parser()
-print(setup_cohere_client())
 logger = logging.getLogger(__name__)
 
 
@@ -42,18 +32,28 @@ class InterviewQuestionGenerator(dspy.Module):
         super().__init__()
         self.generate_question = dspy.Predict(GenerateInterviewQuestion)
     
-    def forward(self, resume_text, job_text, previous_questions=[], previous_answers=[]):
-        logger.debug(f"InterviewQuestionGenerator.forward called with: previous_questions={previous_questions}, type={type(previous_questions)}")
+    def build_inputs(self, resume_text, job_text, previous_questions=[], previous_answers=[], history_summary=""):
+        """Map the interview state onto the GenerateInterviewQuestion input fields."""
         # Convert lists to strings
         previous_questions_str = "\n".join(previous_questions) if previous_questions else ""
+        if history_summary:
+            # Older turns arrive summarized; the lists only hold the most recent ones
+            previous_questions_str = f"Summary of earlier turns: {history_summary}\n{previous_questions_str}"
         previous_answers_str = "\n".join(previous_answers) if previous_answers else ""
-        
-        prediction = self.generate_question(
-            resume_text=resume_text, 
-            job_text=job_text, 
+        return dict(
+            resume_text=resume_text,
+            job_text=job_text,
             previous_questions=previous_questions_str,
             previous_answers=previous_answers_str
         )
+
+    def forward(self, resume_text, job_text, previous_questions=[], previous_answers=[], history_summary=""):
+        logger.debug(f"InterviewQuestionGenerator.forward called with: previous_questions={previous_questions}, type={type(previous_questions)}")
+        # The LM is created on first use rather than when this module is imported
+        with tracer.span("generate_question.forward"), dspy.context(lm=get_lm()):
+            prediction = self.generate_question(
+                **self.build_inputs(resume_text, job_text, previous_questions, previous_answers, history_summary)
+            )
         
         return dspy.Prediction(question=prediction.question, rationale=prediction.rationale)
 
@@ -1,60 +1,101 @@
-import streamlit as st
-from question_generation import InterviewQuestionGenerator
-
 from cohere.errors import TooManyRequestsError, BadRequestError, UnauthorizedError
-import time
-from config import setup_logging
+from config import get_lm, lm_backend, setup_logging, stream_recording_path
 import logging
-from compile_module import compile_and_save_module, evaluate_model
+from program_registry import get_registry
+from backends import StubStreamingBackend
+from streaming import CohereStreamingBackend, CompletedQuestion, QuestionStream, RecordedStreamingBackend
+from generation_cache import generation_cache
+from tracing import tracer
 
 setup_logging()
 
-# @st.cache_data(ttl=3600, max_entries=9)
 def rate_limited_generate_question(
     resume_text,
     job_text,
     previous_questions = [],
-    previous_answers=[]
+    previous_answers=[],
+    history_summary=""
 ) :
     # previous_questions_str = " ".join(previous_questions) if previous_questions else ""
     # previous_answers_str = " ".join(previous_answers) if previous_answers else ""
 
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            # if generator is None:
-            generator = InterviewQuestionGenerator()
-            result = compile_and_save_module(
-                compile_module=generator,
-                resume_text=resume_text,
-                job_text=job_text,
-                previous_questions=previous_questions,
-                previous_answers=previous_answers
-            )
-            evaluator = evaluate_model(generator)
-            print(evaluator)
+    # Cohere calls wait for the shared scheduler and retry 429s there with jittered backoff
+    try:
+        with tracer.span("generate_question") as span:
+            # The compiled program is shared by all sessions and only loaded once per process
+            registry = get_registry()
+            generator = registry.get_program()
+            key = generation_cache.key(registry.version, resume_text, job_text,
+                                       previous_questions, previous_answers, history_summary)
+            cached = generation_cache.get(key)
+            span.set("cache_hit", cached is not None)
+            if cached is not None:
+                logging.info("Generation cache hit")
+                return cached
+            result = generator(resume_text, job_text, previous_questions, previous_answers, history_summary)
+            if result.question:
+                generation_cache.set(key, result.question, result.rationale)
             return result.question, result.rationale
-        except UnauthorizedError as e:
-            logging.error(f"Unauthorized error: {str(e)}")
-            # st.error("Invalid API key. Please check your Cohere API key and try again.")
-            raise
-        except TooManyRequestsError:
-            if attempt < max_retries - 1:
-                wait_time = 70 * (attempt + 1)
-                # st.warning(f"Rate limit reached. Waiting for {wait_time} seconds before trying again.")
-                logging.warning(f"Rate limit reached. Waiting for {wait_time} seconds before trying again.")
-                time.sleep(wait_time)
-            else:
-                # st.error("Rate limit exceeded. Please try again later.")
-                logging.error("Rate limit exceeded. Please try again later.")
-                raise
-        except BadRequestError as e:
-            # st.error(f"Error generating question: {str(e)}")
-            logging.error(f"Error generating question: {str(e)}")
-            return None, None
-        except Exception as e:
-            logging.error(f"Unexpected error in rate_limited_generate_question: {str(e)}")
-            # st.error(f"An unexpected error occurred: {str(e)}")
-            raise
-
-    return None, None  # If all retries fa
\ No newline at end of file
+    except UnauthorizedError as e:
+        logging.error(f"Unauthorized error: {str(e)}")
+        # st.error("Invalid API key. Please check your Cohere API key and try again.")
+        raise
+    except TooManyRequestsError:
+        # st.error("Rate limit exceeded. Please try again later.")
+        logging.error("Rate limit exceeded. Please try again later.")
+        raise
+    except BadRequestError as e:
+        # st.error(f"Error generating question: {str(e)}")
+        logging.error(f"Error generating question: {str(e)}")
+        return None, None
+    except Exception as e:
+        logging.error(f"Unexpected error in rate_limited_generate_question: {str(e)}")
+        # st.error(f"An unexpected error occurred: {str(e)}")
+        raise
+
+
+_streaming_backend = None
+
+def get_streaming_backend():
+    global _streaming_backend
+    if _streaming_backend is None:
+        if stream_recording_path:
+            _streaming_backend = RecordedStreamingBackend.from_file(stream_recording_path, delay=0.02)
+        elif lm_backend == "stub":
+            _streaming_backend = StubStreamingBackend(get_lm())
+        else:
+            _streaming_backend = CohereStreamingBackend(get_lm())
+    return _streaming_backend
+
+def stream_generate_question(
+    resume_text,
+    job_text,
+    previous_questions = [],
+    previous_answers=[],
+    history_summary=""
+):
+    """Return a QuestionStream over the shared compiled program; iterate it to receive the question."""
+    registry = get_registry()
+    program = registry.get_program()
+    key = generation_cache.key(registry.version, resume_text, job_text,
+                               previous_questions, previous_answers, history_summary)
+    cached = generation_cache.get(key)
+    if cached is not None:
+        logging.info("Generation cache hit")
+        with tracer.span("generate_question", streaming=True, cache_hit=True):
+            return CompletedQuestion(*cached)
+
+    def on_complete(stream):
+        if stream.question:
+            generation_cache.set(key, stream.question, stream.rationale)
+
+    return QuestionStream(
+        program,
+        get_streaming_backend(),
+        on_complete=on_complete,
+        resume_text=resume_text,
+        job_text=job_text,
+        previous_questions=previous_questions,
+        previous_answers=previous_answers,
+        history_summary=history_summary
+    )
@@ -0,0 +1,134 @@
+"""Per-interview retrieval of the resume and job description chunks worth prompting with.
+
+Both documents are chunked once when the interview starts and embedded into
+a small in-memory index. Each turn then sends the generator only the top-k
+chunks for the skill being probed and the candidate's last answer, instead
+of the whole (truncated) documents.
+
+Embeddings come from sentence-transformers when ``retrieval_model`` names a
+model and the package is installed, and from a TF-IDF model fitted on the
+interview's own chunks otherwise.
+"""
+import functools
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+
+from config import retrieval_chunk_tokens, retrieval_model, setup_logging
+from context_budget import count_tokens, split_sections
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+token_pattern = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+@dataclass
+class Chunk:
+    source: str
+    position: int
+    text: str
+
+
+def chunk_document(text, source, max_tokens=retrieval_chunk_tokens):
+    """Pack consecutive sections (or lines of an oversized section) into chunks of about max_tokens."""
+    pieces = []
+    for section in split_sections(text or ""):
+        pieces.extend(section.splitlines() if count_tokens(section) > max_tokens else [section])
+
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        piece_size = count_tokens(piece)
+        if current and size + piece_size > max_tokens:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += piece_size
+    if current:
+        chunks.append("\n".join(current))
+    return [Chunk(source, position, chunk) for position, chunk in enumerate(chunks)]
+
+
+class TfidfEmbedder:
+    """TF-IDF vectors over the vocabulary of the chunks the index is built from."""
+
+    def fit(self, texts):
+        documents = [Counter(token_pattern.findall(text.lower())) for text in texts]
+        document_frequency = Counter(term for counts in documents for term in counts)
+        self.vocabulary = {term: column for column, term in enumerate(document_frequency)}
+        self.idf = np.array([
+            math.log((1 + len(documents)) / (1 + document_frequency[term])) + 1 for term in self.vocabulary
+        ])
+        return self
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), len(self.vocabulary)))
+        for row, text in enumerate(texts):
+            for term, count in Counter(token_pattern.findall(text.lower())).items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    vectors[row, column] = 1 + math.log(count)
+        vectors *= self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+@functools.lru_cache(maxsize=1)
+def load_sentence_transformer(model_name):
+    from sentence_transformers import SentenceTransformer
+    logger.info(f"Loading embedding model {model_name}")
+    return SentenceTransformer(model_name)
+
+
+class SentenceTransformerEmbedder:
+    """Embeddings from a local sentence-transformers model, shared by every interview."""
+
+    def __init__(self, model_name):
+        self.model = load_sentence_transformer(model_name)
+
+    def fit(self, texts):
+        return self
+
+    def embed(self, texts):
+        return np.asarray(self.model.encode(list(texts), normalize_embeddings=True))
+
+
+def create_embedder():
+    if retrieval_model:
+        try:
+            return SentenceTransformerEmbedder(retrieval_model)
+        except ImportError:
+            logger.warning("sentence-transformers is not installed, falling back to TF-IDF retrieval")
+    return TfidfEmbedder()
+
+
+class ChunkIndex:
+    """Embedded chunks of one interview's documents."""
+
+    def __init__(self, chunks, embedder=None):
+        self.chunks = chunks
+        texts = [chunk.text for chunk in chunks]
+        self.embedder = (embedder or create_embedder()).fit(texts)
+        self.vectors = self.embedder.embed(texts) if chunks else None
+
+    @classmethod
+    def from_documents(cls, documents, embedder=None):
+        """Build the index from a mapping of source name to document text."""
+        chunks = [chunk for source, text in documents.items() for chunk in chunk_document(text, source)]
+        index = cls(chunks, embedder)
+        logger.debug(f"Indexed {len(chunks)} chunks from {', '.join(documents)}")
+        return index
+
+    def search(self, query, source, k):
+        """The k chunks of source most similar to query, joined in document order."""
+        rows = [row for row, chunk in enumerate(self.chunks) if chunk.source == source]
+        if not rows:
+            return ""
+        scores = self.vectors[rows] @ self.embedder.embed([query])[0]
+        # Stable sort, so a query that matches nothing keeps the start of the document
+        best = sorted(np.argsort(-scores, kind="stable")[:k])
+        return "\n\n".join(self.chunks[rows[i]].text for i in best)
@@ -0,0 +1,73 @@
+"""Where the API server keeps interview sessions between requests.
+
+``session_store=memory`` keeps live InterviewSession objects in the process,
+dropping the least recently used beyond ``session_memory_limit`` and any left
+idle for ``session_idle_minutes``; ``session_store=sqlite`` serializes them to ``session_store_path`` so
+interviews survive a restart.
+"""
+import threading
+
+from cachetools import LRUCache, TTLCache
+
+from cache_store import SqliteCache
+from config import (session_cache_size, session_idle_minutes, session_memory_limit, session_store,
+                    session_store_path)
+from interview_session import InterviewSession
+
+
+class MemorySessionStore:
+    def __init__(self, max_sessions=session_memory_limit, idle_minutes=session_idle_minutes):
+        # Every put restarts the session's timer, so only abandoned interviews expire
+        self._sessions = TTLCache(maxsize=max_sessions, ttl=idle_minutes * 60)
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def put(self, session_id, session):
+        with self._lock:
+            self._sessions[session_id] = session
+
+
+class SqliteSessionStore:
+    """Sessions stored as InterviewSession.to_dict JSON in a SqliteCache table.
+
+    Rebuilding a session re-runs the budgeting and re-embeds its chunks, so
+    the most recently used sessions are also kept live in memory and only
+    read back from SQLite after a restart or eviction. Writes go to both.
+    """
+
+    def __init__(self, path, cache_size=session_cache_size):
+        self._table = SqliteCache(path)
+        self._live = LRUCache(maxsize=cache_size)
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._live.get(session_id)
+        if session is None:
+            state = self._table.get(session_id)
+            if state is None:
+                return None
+            session = InterviewSession.from_dict(state)
+            with self._lock:
+                session = self._live.setdefault(session_id, session)
+        return session
+
+    def put(self, session_id, session):
+        self._table.set(session_id, session.to_dict())
+        with self._lock:
+            self._live[session_id] = session
+
+
+session_stores = {
+    "memory": MemorySessionStore,
+    "sqlite": lambda: SqliteSessionStore(session_store_path),
+}
+
+
+def create_session_store(kind=session_store):
+    if kind not in session_stores:
+        raise ValueError(f"Unknown session store {kind!r}, expected one of {', '.join(session_stores)}")
+    return session_stores[kind]()
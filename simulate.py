@@ -0,0 +1,132 @@
+"""Run full interviews headlessly across a pool of worker processes.
+
+Usage: ``python simulate.py cases/ --turns 6 --workers 4 --output transcripts.jsonl``
+
+Each subdirectory of the cases directory is one interview and holds
+``resume.pdf`` and ``job.pdf`` (or ``.txt`` files with the text already
+extracted). If it also has ``answers.json`` (a list of strings), those answers
+are given in order; otherwise the candidate's answers are simulated by the LLM
+from the resume. All workers draw from one shared Cohere token bucket.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import dspy
+
+from config import cohere_burst, cohere_calls_per_minute, get_lm, setup_logging
+from interview_session import InterviewSession
+from llm_scheduler import SharedTokenBucket, use_shared_bucket
+from program_registry import get_registry
+from utils import safe_parse_pdf
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class SimulateCandidateAnswer(dspy.Signature):
+    """Answer an interview question as the candidate described by the resume would."""
+    resume_text = dspy.InputField(desc="The candidate's resume")
+    question = dspy.InputField(desc="The interviewer's question")
+    answer = dspy.OutputField(desc="The candidate's answer, two to four sentences")
+
+
+def load_document(case_dir, stem):
+    text_path = os.path.join(case_dir, f"{stem}.txt")
+    if os.path.exists(text_path):
+        with open(text_path, encoding="utf-8") as f:
+            return f.read()
+    return safe_parse_pdf(os.path.join(case_dir, f"{stem}.pdf"), stem)
+
+
+def load_answers(case_dir):
+    answers_path = os.path.join(case_dir, "answers.json")
+    if not os.path.exists(answers_path):
+        return None
+    with open(answers_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_interview(case_dir, max_turns):
+    """Run one interview to completion or max_turns and return its transcript record."""
+    record = {"case": os.path.basename(case_dir.rstrip(os.sep)), "turns": [], "completed": False, "error": None}
+    started = time.perf_counter()
+    try:
+        resume_text = load_document(case_dir, "resume")
+        job_text = load_document(case_dir, "job")
+        if not resume_text or not job_text:
+            raise ValueError("Could not load the resume or job description")
+        scripted_answers = load_answers(case_dir)
+        simulate_answer = dspy.Predict(SimulateCandidateAnswer)
+
+        session = InterviewSession(resume_text, job_text)
+        for turn in range(max_turns):
+            # Stop before generating a question there is no scripted answer for
+            if scripted_answers is not None and turn >= len(scripted_answers):
+                break
+            turn_started = time.perf_counter()
+            question = session.next_question()
+            question_seconds = time.perf_counter() - turn_started
+            if question is None:
+                break
+            if scripted_answers is not None:
+                answer = scripted_answers[turn]
+            else:
+                with dspy.context(lm=get_lm()):
+                    answer = simulate_answer(resume_text=session.resume_text, question=question).answer
+            session.submit_answer(answer)
+            record["turns"].append({
+                "question": question,
+                "answer": answer,
+                "question_seconds": round(question_seconds, 3),
+            })
+        record["completed"] = session.transcript.completed or len(record["turns"]) == max_turns
+    except Exception as e:
+        logger.error(f"Interview {record['case']} failed: {str(e)}")
+        record["error"] = str(e)
+    record["total_seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def run_simulation(cases_dir, output_path, max_turns=6, workers=4):
+    case_dirs = sorted(
+        os.path.join(cases_dir, name) for name in os.listdir(cases_dir)
+        if os.path.isdir(os.path.join(cases_dir, name))
+    )
+    # Compile (or load) once in the parent so workers never bootstrap the program in parallel
+    get_registry().get_program()
+    # Spawned rather than forked: the parent has open SQLite connections (parse and verdict
+    # caches) that must not be shared with the workers
+    context = multiprocessing.get_context("spawn")
+    bucket = SharedTokenBucket(cohere_calls_per_minute, cohere_burst, context)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    finished = 0
+    with open(output_path, "w", encoding="utf-8") as output, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                initializer=use_shared_bucket, initargs=(bucket,)) as pool:
+        futures = [pool.submit(run_interview, case_dir, max_turns) for case_dir in case_dirs]
+        for future in as_completed(futures):
+            output.write(json.dumps(future.result()) + "\n")
+            output.flush()
+            finished += 1
+            logger.info(f"{finished}/{len(case_dirs)} interviews finished")
+    return finished
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run interviews headlessly and write transcripts to JSONL.")
+    parser.add_argument("cases", help="Directory with one subdirectory per interview")
+    parser.add_argument("--output", default=os.path.join("reports", "transcripts.jsonl"),
+                        help="JSONL file the transcripts are streamed to")
+    parser.add_argument("--turns", type=int, default=6, help="Maximum questions per interview")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes")
+    args = parser.parse_args()
+    run_simulation(args.cases, args.output, args.turns, args.workers)
+
+
+if __name__ == "__main__":
+    main()
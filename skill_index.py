@@ -0,0 +1,95 @@
+"""Skill coverage index for an interview.
+
+Skills and their aliases come from an extensible taxonomy file
+(``data/skill_taxonomy.json`` by default: a skill name mapped to its aliases).
+All aliases are compiled into one regular expression, so finding the skills
+in a text is a single pass however large the taxonomy grows.
+"""
+import functools
+import json
+import logging
+import re
+from collections import Counter
+
+from config import setup_logging, skill_question_limit, skill_taxonomy_path
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class SkillMatcher:
+    """Finds taxonomy skills in text with one compiled alternation of every alias."""
+
+    def __init__(self, taxonomy):
+        self.skills = {}
+        for skill, aliases in taxonomy.items():
+            for alias in [skill, *aliases]:
+                self.skills[alias.lower()] = skill
+        # Longest aliases first, so "spring boot" wins over "spring"
+        aliases = sorted(self.skills, key=len, reverse=True)
+        # Lookarounds instead of \b, so aliases such as "c++" and ".net" still match
+        self.pattern = re.compile(
+            r"(?<![\w+#])(?:" + "|".join(re.escape(alias) for alias in aliases) + r")(?![\w+#])",
+            re.IGNORECASE
+        )
+
+    def find(self, text):
+        """Skills mentioned in text, in order of first mention."""
+        found = {}
+        for match in self.pattern.finditer(text or ""):
+            found.setdefault(self.skills[match.group(0).lower()], None)
+        return list(found)
+
+
+@functools.lru_cache(maxsize=None)
+def get_skill_matcher(path=skill_taxonomy_path):
+    with open(path, encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    logger.info(f"Loaded {len(taxonomy)} skills from {path}")
+    return SkillMatcher(taxonomy)
+
+
+class SkillIndex:
+    """Skills an interview is about and how many questions each one has had.
+
+    Built once per interview from the job description and resume; question
+    counts are updated as each question is asked, so checking whether a skill
+    has been covered enough never rescans the history.
+    """
+
+    def __init__(self, job_text="", resume_text="", matcher=None, question_limit=skill_question_limit):
+        self.matcher = matcher or get_skill_matcher()
+        self.question_limit = question_limit
+        self.job_skills = self.matcher.find(job_text)
+        self.resume_skills = self.matcher.find(resume_text)
+        self.question_counts = Counter()
+
+    @classmethod
+    def from_questions(cls, questions, **kwargs):
+        index = cls(**kwargs)
+        for question in questions:
+            index.add_question(question)
+        return index
+
+    def add_question(self, question):
+        self.question_counts.update(self.matcher.find(question))
+
+    def current_skill(self, question):
+        """The skill a question is about, preferring skills the job asks for."""
+        skills = self.matcher.find(question)
+        for skill in skills:
+            if skill in self.job_skills:
+                return skill
+        return skills[0] if skills else None
+
+    def is_redundant(self, question):
+        """True if the question's skill has already had question_limit questions."""
+        skill = self.current_skill(question)
+        return skill is not None and self.question_counts[skill] >= self.question_limit
+
+    def uncovered_skills(self):
+        """Job skills that have not been asked about yet, in job description order."""
+        return [skill for skill in self.job_skills if not self.question_counts[skill]]
+
+    def coverage(self):
+        return {skill: self.question_counts[skill] for skill in self.job_skills}
@@ -0,0 +1,162 @@
+import itertools
+import json
+import logging
+import time
+
+import dsp
+from dspy.signatures.signature import signature_to_template
+
+from config import setup_logging
+from llm_scheduler import get_scheduler
+from tracing import tracer
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+rationale_marker = "Rationale:"
+
+
+class CohereStreamingBackend:
+    """Streams a completion for a prompt from Cohere chat.
+
+    Uses the client and generation settings (temperature, max_tokens, stop
+    sequences) of the configured Cohere LM, so a streamed completion matches
+    the blocking one for the same prompt; both feed the generation cache.
+    """
+
+    def __init__(self, lm):
+        self.lm = lm
+
+    def request_kwargs(self, prompt):
+        # Mirrors dspy's Cohere.basic_request
+        kwargs = {**self.lm.kwargs, "stop_sequences": self.lm.stop_sequences, "chat_history": [], "message": prompt}
+        kwargs.pop("num_generations", None)
+        kwargs.pop("n", None)
+        return kwargs
+
+    def open_stream(self, prompt):
+        """Start the stream and read its first event, so a 429 is raised here and retried by the scheduler."""
+        events = self.lm.co.chat_stream(**self.request_kwargs(prompt))
+        return next(events, None), events
+
+    def stream(self, prompt):
+        span = tracer.start_span("llm.request", backend="cohere", streaming=True)
+        try:
+            # Active only while waiting, so the scheduler records queue wait and retries on it
+            with tracer.activate(span):
+                first, events = get_scheduler().call(self.open_stream, prompt)
+            for event in itertools.chain([first] if first is not None else [], events):
+                if event.event_type == "text-generation":
+                    yield event.text
+                elif event.event_type == "stream-end":
+                    billed = getattr(getattr(event.response, "meta", None), "billed_units", None)
+                    if billed is not None:
+                        span.set("prompt_tokens", billed.input_tokens or 0)
+                        span.set("completion_tokens", billed.output_tokens or 0)
+        except Exception as e:
+            span.set("error", type(e).__name__)
+            raise
+        finally:
+            tracer.end_span(span)
+
+
+class RecordedStreamingBackend:
+    """Replays a recorded completion in small chunks, for running offline."""
+
+    def __init__(self, completion, chunk_size=12, delay=0.0):
+        self.completion = completion
+        self.chunk_size = chunk_size
+        self.delay = delay
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load a recording saved as {"completion": "..."}."""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f)["completion"], **kwargs)
+
+    def stream(self, prompt):
+        for start in range(0, len(self.completion), self.chunk_size):
+            if self.delay:
+                time.sleep(self.delay)
+            yield self.completion[start:start + self.chunk_size]
+
+
+class QuestionStream:
+    """Stream the question of a compiled InterviewQuestionGenerator as it is generated.
+
+    Iterating yields the question text only; once the iteration is over,
+    ``question`` and ``rationale`` hold the parsed fields of the full completion.
+    The prompt is rendered from the program's own signature and demos, so it is
+    the same prompt the non-streaming path would send.
+    """
+
+    def __init__(self, program, backend, on_complete=None, **inputs):
+        predictor = program.generate_question
+        self.template = signature_to_template(predictor.signature)
+        self.example = dsp.Example(demos=predictor.demos, **program.build_inputs(**inputs))
+        self.backend = backend
+        self.on_complete = on_complete
+        self.completion = ""
+        self.question = None
+        self.rationale = None
+
+    def __iter__(self):
+        span = tracer.start_span("generate_question", streaming=True, cache_hit=False)
+        try:
+            yield from self.stream_question(span)
+        except Exception as e:
+            span.set("error", type(e).__name__)
+            raise
+        finally:
+            tracer.end_span(span)
+
+    def chunks(self, span):
+        """The backend's chunks, pulled with span active so backend spans nest under it."""
+        chunks = self.backend.stream(self.template(self.example))
+        while True:
+            with tracer.activate(span):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            if not self.completion:
+                span.set("first_chunk_seconds", time.perf_counter() - span.perf_started)
+            yield chunk
+
+    def stream_question(self, span):
+        pending = ""
+        in_question = True
+        for chunk in self.chunks(span):
+            self.completion += chunk
+            if not in_question:
+                continue
+            pending += chunk
+            marker_at = pending.find(rationale_marker)
+            if marker_at >= 0:
+                in_question = False
+                yield pending[:marker_at]
+                continue
+            # Hold back a tail that could be the start of the rationale marker
+            safe = len(pending) - len(rationale_marker)
+            if safe > 0:
+                yield pending[:safe]
+                pending = pending[safe:]
+        if in_question and pending:
+            yield pending
+
+        parsed = self.template.extract(self.example, self.completion)
+        self.question = (parsed.get("question") or "").strip()
+        self.rationale = (parsed.get("rationale") or "").strip()
+        logger.debug(f"Streamed question: {self.question}")
+        if self.on_complete is not None:
+            self.on_complete(self)
+
+
+class CompletedQuestion:
+    """An already generated question exposed through the QuestionStream interface."""
+
+    def __init__(self, question, rationale):
+        self.question = question
+        self.rationale = rationale
+
+    def __iter__(self):
+        yield self.question
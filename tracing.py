@@ -0,0 +1,233 @@
+"""Structured spans for finding where interview time goes.
+
+Wrap a stage in ``with tracer.span("parse_pdf") as span:`` and attach numbers
+with ``span.add("prompt_tokens", n)`` or flags with ``span.set("cache_hit",
+True)``. Every finished span is aggregated in memory (duration, count,
+errors, and the sum of its numeric and boolean attributes) and, when
+``trace_path`` is set, appended to that JSONL file.
+
+Work that yields between its steps, such as a streamed completion, uses
+``tracer.start_span`` / ``tracer.end_span`` and activates the span only
+around each step, so spans opened by the consumer in between are not nested
+under it.
+
+Usage: ``python tracing.py reports/trace.jsonl [--prometheus trace.prom]``
+prints a per-span summary of a trace file and optionally writes it in the
+Prometheus text format.
+"""
+import argparse
+import atexit
+import contextlib
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+import uuid
+from collections import deque
+
+from config import setup_logging, trace_metrics_path, trace_path
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    def __init__(self, name, parent, attributes):
+        self.name = name
+        self.id = uuid.uuid4().hex[:16]
+        self.trace_id = parent.trace_id if parent else self.id
+        self.parent_id = parent.id if parent else None
+        self.attributes = dict(attributes)
+        self.started = time.time()
+        self.perf_started = time.perf_counter()
+        self.duration = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def add(self, key, amount=1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.id,
+            "parent_id": self.parent_id,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "start": self.started,
+            "duration_seconds": self.duration,
+            "attributes": self.attributes,
+        }
+
+
+class SpanStats:
+    """Per-span-name totals, fed either live spans or records read back from a trace file.
+
+    Quantiles come from the most recent ``sample_size`` durations, so a
+    long-running server does not keep every span it has seen.
+    """
+
+    def __init__(self, sample_size=10000):
+        self.sample_size = sample_size
+        self.counts = {}
+        self.seconds = {}
+        self.durations = {}
+        self.errors = {}
+        self.totals = {}
+
+    def add(self, record):
+        name = record["name"]
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.seconds[name] = self.seconds.get(name, 0.0) + record["duration_seconds"]
+        self.durations.setdefault(name, deque(maxlen=self.sample_size)).append(record["duration_seconds"])
+        self.errors[name] = self.errors.get(name, 0) + ("error" in record["attributes"])
+        totals = self.totals.setdefault(name, {})
+        for key, value in record["attributes"].items():
+            # Booleans count how often a flag such as cache_hit was set; strings are not aggregated
+            if isinstance(value, (bool, int, float)):
+                totals[key] = totals.get(key, 0) + value
+
+    def summary(self):
+        summary = {}
+        for name, durations in sorted(self.durations.items()):
+            ordered = sorted(durations)
+            summary[name] = {
+                "count": self.counts[name],
+                "errors": self.errors[name],
+                "total_seconds": round(self.seconds[name], 4),
+                "p50_seconds": round(statistics.median(ordered), 4),
+                "p95_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+                "max_seconds": round(ordered[-1], 4),
+                **{key: round(value, 4) for key, value in sorted(self.totals[name].items())},
+            }
+        return summary
+
+    def prometheus_text(self, prefix="interview"):
+        lines = [
+            f"# TYPE {prefix}_span_seconds summary",
+            f"# TYPE {prefix}_span_errors_total counter",
+            f"# TYPE {prefix}_span_attribute_total counter",
+        ]
+        for name, stats in self.summary().items():
+            label = f'span="{name}"'
+            lines.append(f"{prefix}_span_seconds_count{{{label}}} {stats['count']}")
+            lines.append(f"{prefix}_span_seconds_sum{{{label}}} {stats['total_seconds']}")
+            lines.append(f'{prefix}_span_seconds{{{label},quantile="0.5"}} {stats["p50_seconds"]}')
+            lines.append(f'{prefix}_span_seconds{{{label},quantile="0.95"}} {stats["p95_seconds"]}')
+            lines.append(f"{prefix}_span_errors_total{{{label}}} {stats['errors']}")
+            for key, value in sorted(self.totals[name].items()):
+                lines.append(f'{prefix}_span_attribute_total{{{label},attribute="{key}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+class Tracer:
+    """Process-wide span recorder; the open spans are tracked per thread."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.stats = SpanStats()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._file = None
+
+    def current(self):
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def start_span(self, name, **attributes):
+        """Open a span under the current one without making it current; finish it with end_span."""
+        return Span(name, self.current(), attributes)
+
+    def end_span(self, span):
+        span.duration = time.perf_counter() - span.perf_started
+        self.record(span)
+
+    @contextlib.contextmanager
+    def activate(self, span):
+        """Make span the current span of this thread inside the block."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        span = self.start_span(name, **attributes)
+        try:
+            with self.activate(span):
+                yield span
+        except Exception as e:
+            span.set("error", type(e).__name__)
+            raise
+        finally:
+            self.end_span(span)
+
+    def record(self, span):
+        record = span.to_dict()
+        with self._lock:
+            self.stats.add(record)
+            if self.path:
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+                self._file.write(json.dumps(record, default=str) + "\n")
+
+    def summary(self):
+        with self._lock:
+            return self.stats.summary()
+
+    def prometheus_text(self):
+        with self._lock:
+            return self.stats.prometheus_text()
+
+    def write_prometheus(self, path):
+        """Write the in-process totals to path, for a Prometheus textfile collector."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+tracer = Tracer(trace_path)
+
+if trace_metrics_path:
+    atexit.register(tracer.write_prometheus, trace_metrics_path)
+
+
+def read_trace(path):
+    stats = SpanStats()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                stats.add(json.loads(line))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a JSONL trace file per span.")
+    parser.add_argument("trace", nargs="?", default=trace_path, help="Trace file written with trace_path set")
+    parser.add_argument("--prometheus", help="Also write the totals in Prometheus text format to this file")
+    args = parser.parse_args()
+    if not args.trace:
+        parser.error("no trace file given and trace_path is not set")
+
+    stats = read_trace(args.trace)
+    for name, summary in stats.summary().items():
+        details = ", ".join(f"{key}={value}" for key, value in summary.items())
+        print(f"{name:32} {details}")
+    if args.prometheus:
+        with open(args.prometheus, "w", encoding="utf-8") as f:
+            f.write(stats.prometheus_text())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""Versioned on-disk store of training examples for BootstrapFewShot.
+
+The store is a JSON Lines file. The first line is a header naming the format
+version; every following line is either a document or an example record::
+
+    {"format": "interview-trainset", "version": 2}
+    {"kind": "document", "id": "resume", "text": "Phil Carter\nSenior Java Developer..."}
+    {"kind": "document", "id": "job", "path": "../jobdiscr.pdf"}
+    {"kind": "example", "resume": "resume", "job": "job", "previous_questions": [], ...}
+
+Documents are stored once, by path (relative to the store) or inline text, and
+examples refer to them by id. Loaded examples share one string per document,
+so a large trainset does not hold a copy of the resume per example.
+
+Version 2 stores ``previous_answers`` as a list aligned with
+``previous_questions``; version 1 kept only the last answer as a string.
+
+Usage: ``python trainset_store.py append transcripts.jsonl --cases cases/``
+appends the turns of simulate.py transcripts as new examples, and
+``python trainset_store.py append-sessions`` appends the turns of the real
+interviews kept in the API server's SQLite session store.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import mmap
+import os
+from dataclasses import asdict, dataclass, field
+from typing import List
+
+from cache_store import SqliteCache
+from config import session_store_path, setup_logging, trainset_path
+from transcript import InterviewTranscript
+from utils import extract_pdf_text
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+format_name = "interview-trainset"
+format_version = 2
+
+
+@dataclass
+class TrainRecord:
+    """One training example; resume and job are document ids."""
+    resume: str
+    job: str
+    question: str
+    previous_questions: List[str] = field(default_factory=list)
+    previous_answers: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, record):
+        previous = {name: record.get(name, []) for name in ("previous_questions", "previous_answers")}
+        for name, value in previous.items():
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValueError(f"{name} must be a list of strings")
+        if len(previous["previous_answers"]) > len(previous["previous_questions"]):
+            raise ValueError("previous_answers has more entries than previous_questions")
+        values = {name: record.get(name) for name in ("resume", "job", "question")}
+        for name, value in values.items():
+            if not isinstance(value, str) or not value:
+                raise ValueError(f"{name} must be a non-empty string")
+        return cls(**previous, **values)
+
+    def to_dict(self):
+        return {"kind": "example", **asdict(self)}
+
+    def key(self):
+        return self.resume, self.job, self.question, tuple(self.previous_questions), tuple(self.previous_answers)
+
+
+def iter_records(path):
+    """Yield the (line number, record) pairs of a store, reading it through mmap."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{path} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            header = json.loads(mapped.readline())
+            if header.get("format") != format_name:
+                raise ValueError(f"{path} is not an {format_name} file")
+            if header.get("version") != format_version:
+                raise ValueError(f"{path} has format version {header.get('version')}, expected {format_version}")
+            for line_number, line in enumerate(iter(mapped.readline, b""), start=2):
+                if line.strip():
+                    yield line_number, json.loads(line)
+
+
+def read_document(path, name):
+    if path.endswith(".pdf"):
+        return extract_pdf_text(path, name)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class TrainsetStore:
+    """Reader and appender for a trainset file."""
+
+    def __init__(self, path=trainset_path):
+        self.path = path
+        self.base_dir = os.path.dirname(os.path.abspath(path))
+
+    def exists(self):
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def scan(self):
+        """Return (documents, examples): document records by id and the typed example records.
+
+        Each document record also carries the ``line`` it was read from, for error messages.
+        """
+        documents, examples = {}, []
+        for line_number, record in iter_records(self.path):
+            try:
+                kind = record.get("kind")
+                if kind == "document":
+                    if "path" not in record and "text" not in record:
+                        raise ValueError("document needs a path or text")
+                    documents[record["id"]] = {**record, "line": line_number}
+                elif kind == "example":
+                    examples.append(TrainRecord.from_dict(record))
+                else:
+                    raise ValueError(f"unknown record kind {kind!r}")
+            except (KeyError, ValueError) as e:
+                raise ValueError(f"{self.path}:{line_number}: {str(e)}") from e
+        return documents, examples
+
+    def fingerprint(self):
+        """SHA-256 of the store file and of every document file it references, without parsing them."""
+        digest = hashlib.sha256()
+        with open(self.path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+        documents = self.scan()[0]
+        for document_id, document in sorted(documents.items()):
+            if "path" not in document:
+                continue
+            try:
+                with open(os.path.join(self.base_dir, document["path"]), "rb") as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+            except OSError as e:
+                raise ValueError(f"{self.path}:{document['line']}: cannot read document {document_id!r}: {str(e)}") from e
+        return digest.hexdigest()
+
+    def iter_examples(self):
+        """Yield (resume_text, job_text, record) per example, loading each document once."""
+        documents, examples = self.scan()
+        texts = {}
+
+        def text(document_id):
+            if document_id not in texts:
+                if document_id not in documents:
+                    raise ValueError(f"{self.path}: unknown document {document_id!r}")
+                document = documents[document_id]
+                if "text" in document:
+                    texts[document_id] = document["text"]
+                else:
+                    try:
+                        texts[document_id] = read_document(os.path.join(self.base_dir, document["path"]), document_id)
+                    except (OSError, ValueError) as e:
+                        raise ValueError(f"{self.path}:{document['line']}: cannot read document {document_id!r}: {str(e)}") from e
+            return texts[document_id]
+
+        for record in examples:
+            yield text(record.resume), text(record.job), record
+
+    def example_keys(self):
+        """TrainRecord.key of every stored example, for skipping examples that are already stored."""
+        return {example.key() for example in self.scan()[1]} if self.exists() else set()
+
+    def append(self, documents, examples):
+        """Append document records (skipping ids already stored) and example records."""
+        new_store = not self.exists()
+        stored = {} if new_store else self.scan()[0]
+        os.makedirs(self.base_dir, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            if new_store:
+                f.write(json.dumps({"format": format_name, "version": format_version}) + "\n")
+            for document in documents:
+                if document["id"] not in stored:
+                    f.write(json.dumps({"kind": "document", **document}) + "\n")
+                    stored[document["id"]] = document
+            for example in examples:
+                f.write(json.dumps(example.to_dict()) + "\n")
+        logger.info(f"Appended {len(examples)} examples to {self.path}")
+
+
+def transcript_records(resume_id, job_id, questions, answers):
+    """One example per question, with the questions and answers that came before it."""
+    return [
+        TrainRecord(resume=resume_id, job=job_id, question=question,
+                    previous_questions=list(questions[:turn]),
+                    previous_answers=list(answers[:turn]))
+        for turn, question in enumerate(questions)
+    ]
+
+
+def interview_records(resume_text, job_text, transcript):
+    """(documents, examples) for an InterviewTranscript, with the documents inline under their content hash."""
+    documents = [
+        {"id": f"{name}-{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}", "text": text}
+        for name, text in (("resume", resume_text), ("job", job_text))
+    ]
+    examples = transcript_records(documents[0]["id"], documents[1]["id"], transcript.questions, transcript.answers)
+    return documents, examples
+
+
+def append_stored_sessions(store, sessions_path=session_store_path, include_incomplete=False):
+    """Append the turns of the interviews in a SQLite session store, skipping examples already stored.
+
+    Documents are keyed by content hash and examples by their inputs and
+    question, so running this again after more interviews only adds the new turns.
+    """
+    stored = store.example_keys()
+    documents, examples = [], []
+    for session_id, state in SqliteCache(sessions_path).items():
+        transcript = InterviewTranscript.from_dict(state["transcript"])
+        if not transcript.questions or not (transcript.completed or include_incomplete):
+            continue
+        session_documents, session_examples = interview_records(
+            state["documents"]["resume"], state["documents"]["job"], transcript)
+        new_examples = [example for example in session_examples if example.key() not in stored]
+        stored.update(example.key() for example in new_examples)
+        if new_examples:
+            documents.extend(session_documents)
+            examples.extend(new_examples)
+            logger.debug(f"Interview {session_id}: {len(new_examples)} new examples")
+    store.append(documents, examples)
+    return len(examples)
+
+
+def case_document(store, case_dir, stem):
+    """Document record for a simulate.py case file, referenced relative to the store."""
+    for extension in (".txt", ".pdf"):
+        path = os.path.join(case_dir, f"{stem}{extension}")
+        if os.path.exists(path):
+            case = os.path.basename(case_dir.rstrip(os.sep))
+            return {"id": f"{case}/{stem}", "path": os.path.relpath(os.path.abspath(path), store.base_dir)}
+    raise FileNotFoundError(f"No {stem}.txt or {stem}.pdf in {case_dir}")
+
+
+def append_simulated_transcripts(store, transcripts_path, cases_dir):
+    """Append the turns of every completed simulate.py transcript to the store, skipping examples already stored."""
+    stored = store.example_keys()
+    documents, examples = [], []
+    with open(transcripts_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            transcript = json.loads(line)
+            if transcript.get("error") or not transcript["turns"]:
+                continue
+            case_dir = os.path.join(cases_dir, transcript["case"])
+            resume, job = case_document(store, case_dir, "resume"), case_document(store, case_dir, "job")
+            documents.extend([resume, job])
+            questions = [turn["question"] for turn in transcript["turns"]]
+            answers = [turn["answer"] for turn in transcript["turns"]]
+            new_examples = [
+                example for example in transcript_records(resume["id"], job["id"], questions, answers)
+                if example.key() not in stored
+            ]
+            stored.update(example.key() for example in new_examples)
+            examples.extend(new_examples)
+    store.append(documents, examples)
+    return len(examples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the BootstrapFewShot trainset.")
+    parser.add_argument("--store", default=trainset_path, help="Trainset file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    append = commands.add_parser("append", help="Append examples from simulate.py transcripts")
+    append.add_argument("transcripts", help="JSONL file written by simulate.py")
+    append.add_argument("--cases", required=True, help="Cases directory the transcripts were simulated from")
+    sessions = commands.add_parser("append-sessions", help="Append examples from the interviews in the session store")
+    sessions.add_argument("--sessions", default=session_store_path, help="SQLite session store of api_server.py")
+    sessions.add_argument("--include-incomplete", action="store_true", help="Also append interviews that have not finished")
+    commands.add_parser("stats", help="Count the documents and examples in the store")
+    args = parser.parse_args()
+
+    store = TrainsetStore(args.store)
+    if args.command == "append":
+        append_simulated_transcripts(store, args.transcripts, args.cases)
+    elif args.command == "append-sessions":
+        append_stored_sessions(store, args.sessions, args.include_incomplete)
+    else:
+        documents, examples = store.scan()
+        print(f"{len(documents)} documents, {len(examples)} examples")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from dataclasses import asdict, dataclass, field
+from typing import List, Tuple
+
+
+@dataclass
+class InterviewTranscript:
+    """Append-only record of an interview.
+
+    Questions and answers are kept in their own lists so the generator inputs
+    never need to be rebuilt from the chat messages, and the turn state is a
+    length comparison rather than a scan.
+    """
+    messages: List[Tuple[str, str]] = field(default_factory=list)
+    questions: List[str] = field(default_factory=list)
+    answers: List[str] = field(default_factory=list)
+    completed: bool = False
+    # Markdown of messages that have scrolled out of the live chat window, built once per message
+    archived_markdown: str = ""
+    archived_count: int = 0
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, state):
+        return cls(**{**state, "messages": [tuple(message) for message in state["messages"]]})
+
+    def add_message(self, role, text):
+        self.messages.append((role, text))
+
+    def add_question(self, question):
+        self.questions.append(question)
+        self.add_message("assistant", f"Q: {question}")
+
+    def add_answer(self, answer):
+        self.answers.append(answer)
+        self.add_message("human", answer)
+
+    def complete(self, closing_message):
+        self.completed = True
+        self.add_message("assistant", closing_message)
+
+    @property
+    def awaiting_answer(self):
+        return len(self.answers) < len(self.questions)
+
+    @property
+    def current_question(self):
+        return self.questions[-1] if self.questions else None
+
+    def live_messages(self, window):
+        """Archive every message older than the last ``window`` and return the rest."""
+        live_from = max(len(self.messages) - window, 0)
+        while self.archived_count < live_from:
+            role, text = self.messages[self.archived_count]
+            speaker = "Interviewer" if role == "assistant" else "Candidate"
+            self.archived_markdown += f"**{speaker}:** {text}\n\n"
+            self.archived_count += 1
+        return self.messages[live_from:]
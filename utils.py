@@ -1,51 +1,156 @@
+import functools
+import hashlib
+import io
 import os
 import tempfile
-import streamlit as st
-from llama_parse import LlamaParse
-from config import setup_llama_parser, setup_logging
+from pypdf import PdfReader
+from config import (get_parser, setup_logging, parser_backend, pdf_cache_path, pdf_cache_max_bytes,
+                    pdf_extractors, pdf_min_chars_per_page, pdf_min_printable_ratio)
+from cache_store import SqliteCache, cache_key
+from tracing import tracer
 import logging
 
 setup_logging()
 
-def truncate_text(text, max_tokens=2048):
-    """Truncate text to a maximum number of tokens (words)."""
-    words = text.split()
-    return ' '.join(words[:max_tokens])
+@functools.lru_cache(maxsize=1)
+def get_pdf_cache():
+    """Parsed PDF text keyed by pdf_cache_key, shared across sessions and restarts."""
+    return SqliteCache(pdf_cache_path, max_bytes=pdf_cache_max_bytes)
 
-@st.cache_data(ttl=1200)
-def parse_pdf(uploaded_file, file_type):
-    """Parse a PDF file using LlamaParse."""
-    if uploaded_file is None:
-        return None
+def read_pdf_bytes(uploaded_file):
+    """Return the raw bytes of a file path or an uploaded file-like object."""
+    if isinstance(uploaded_file, str):
+        with open(uploaded_file, "rb") as f:
+            return f.read()
+    return uploaded_file.getvalue()
 
-    try:
-        parser = setup_llama_parser()
+def pdf_digest(pdf_bytes):
+    return hashlib.sha256(pdf_bytes).hexdigest()
 
-        if isinstance(uploaded_file, str):
-            # If uploaded_file is a string, assume it's a file path
-            temp_path = uploaded_file
-        else:
-            # If uploaded_file is a file-like object (e.g., from st.file_uploader)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                temp_file.write(uploaded_file.getvalue())
-                temp_path = temp_file.name
+def pdf_cache_key(pdf_bytes):
+    """Parse cache key: the PDF digest and the parser backend, so stub text never serves a real run."""
+    return cache_key(parser_backend, pdf_digest(pdf_bytes))
+
+
+class LocalTextExtractor:
+    """In-process extraction of the PDF text layer, one page at a time."""
+    name = "local"
+
+    def iter_pages(self, pdf_bytes):
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        for page in reader.pages:
+            yield page.extract_text() or ""
 
-        # with st.spinner(f"Parsing {file_type.capitalize()}..."):
-        documents = parser.load_data(temp_path)
+    def extract(self, pdf_bytes):
+        pages = list(self.iter_pages(pdf_bytes))
+        return "\n\n".join(pages), len(pages)
+
+
+class LlamaParseExtractor:
+    """Remote extraction through LlamaParse; handles scanned and complex layouts."""
+    name = "llamaparse"
+
+    def extract(self, pdf_bytes):
+        parser = get_parser()
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+            temp_file.write(pdf_bytes)
+            temp_path = temp_file.name
+        try:
+            documents = parser.load_data(temp_path)
+        finally:
+            os.unlink(temp_path)
         if not documents:
             raise ValueError("No documents were parsed")
-        parsed_text = documents[0].text
+        return documents[0].text, len(documents)
 
-        # Clean up the temporary file only if we created one
-        if not isinstance(uploaded_file, str):
-            os.unlink(temp_path)
 
+extractor_registry = {
+    LocalTextExtractor.name: LocalTextExtractor,
+    LlamaParseExtractor.name: LlamaParseExtractor,
+}
+
+def is_acceptable_text(text, page_count,
+                       min_chars_per_page=pdf_min_chars_per_page,
+                       min_printable_ratio=pdf_min_printable_ratio):
+    """Heuristic check that extracted text is usable rather than empty or garbled."""
+    stripped = text.strip()
+    if not stripped:
+        return False
+    if len(stripped) < min_chars_per_page * max(page_count, 1):
+        return False
+    if "(cid:" in stripped or "\ufffd" in stripped:
+        return False
+    printable = sum(1 for c in stripped if c.isprintable() or c.isspace())
+    return printable / len(stripped) >= min_printable_ratio
+
+
+class ExtractorChain:
+    """Try extractors in order and return the first acceptable output."""
+
+    def __init__(self, extractors):
+        self.extractors = extractors
+
+    def extract(self, pdf_bytes):
+        return self.extract_with_status(pdf_bytes)[0]
+
+    def extract_with_status(self, pdf_bytes):
+        """Return (text, final); final is False when a better extractor failed and may succeed on a retry."""
+        best = ""
+        failed = False
+        for position, extractor in enumerate(self.extractors):
+            try:
+                text, page_count = extractor.extract(pdf_bytes)
+            except Exception as e:
+                logging.warning(f"{extractor.name} extractor failed: {str(e)}")
+                failed = True
+                continue
+            is_last = position == len(self.extractors) - 1
+            if is_acceptable_text(text, page_count) or (is_last and text.strip()):
+                logging.info(f"PDF text extracted with {extractor.name}")
+                return text, True
+            logging.info(f"{extractor.name} output below quality threshold, falling back")
+            best = best or text
+        if not best.strip():
+            raise ValueError("No extractor produced any text")
+        return best, not failed
+
+extractor_chain = ExtractorChain([extractor_registry[name.strip()]() for name in pdf_extractors])
+
+def extract_pdf_text(uploaded_file, file_type):
+    """Text of a PDF file, reusing the cached text for PDFs seen before; raises if it cannot be read."""
+    with tracer.span("parse_pdf", file_type=file_type) as span:
+        pdf_bytes = read_pdf_bytes(uploaded_file)
+        digest = pdf_cache_key(pdf_bytes)
+        span.set("pdf_bytes", len(pdf_bytes))
+        pdf_cache = get_pdf_cache()
+        cached_text = pdf_cache.get(digest)
+        span.set("cache_hit", cached_text is not None)
+        if cached_text is not None:
+            logging.info(f"Parse cache hit for {file_type} ({digest[:12]})")
+            return cached_text
+
+        parsed_text, final = extractor_chain.extract_with_status(pdf_bytes)
+        span.set("chars", len(parsed_text))
+        if final:
+            pdf_cache.set(digest, parsed_text)
+        else:
+            # Low-quality fallback after an extractor error: use it now, re-extract next time
+            span.set("fallback", True)
+            logging.warning(f"Using below-threshold text for {file_type} without caching it")
         return parsed_text
+
+def parse_pdf(uploaded_file, file_type):
+    """Parse a PDF file, returning None if it cannot be read."""
+    if uploaded_file is None:
+        return None
+
+    try:
+        return extract_pdf_text(uploaded_file, file_type)
     except Exception as e:
-        logging.error(f"Error parsing {file_type} with LlamaParse: {str(e)}")
+        logging.error(f"Error parsing {file_type}: {str(e)}")
         return None
 
 def safe_parse_pdf(uploaded_file, file_type):
     """Safely parse a PDF file, returning an empty string if parsing fails."""
     parsed_text = parse_pdf(uploaded_file, file_type)
-    return parsed_text if parsed_text is not None else ""
\ No newline at end of file
+    return parsed_text if parsed_text is not None else ""
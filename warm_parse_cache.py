@@ -0,0 +1,41 @@
+"""Pre-parse a directory of PDFs into the persistent parse cache.
+
+Usage: ``python warm_parse_cache.py path/to/job_descriptions [--recursive]``
+"""
+import argparse
+import glob
+import logging
+import os
+
+from config import setup_logging
+from utils import get_pdf_cache, parse_pdf, pdf_cache_key, read_pdf_bytes
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
+def warm_cache(directory, recursive=False):
+    pattern = os.path.join(directory, "**", "*.pdf") if recursive else os.path.join(directory, "*.pdf")
+    parsed, cached, failed = 0, 0, 0
+    for path in sorted(glob.glob(pattern, recursive=recursive)):
+        if pdf_cache_key(read_pdf_bytes(path)) in get_pdf_cache():
+            cached += 1
+            continue
+        if parse_pdf(path, os.path.basename(path)) is None:
+            failed += 1
+        else:
+            parsed += 1
+    logger.info(f"Parse cache warm-up: {parsed} parsed, {cached} already cached, {failed} failed")
+    return parsed, cached, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-parse PDFs into the persistent parse cache.")
+    parser.add_argument("directory", help="Directory containing PDF files")
+    parser.add_argument("--recursive", action="store_true", help="Also parse PDFs in subdirectories")
+    args = parser.parse_args()
+    warm_cache(args.directory, args.recursive)
+
+
+if __name__ == "__main__":
+    main()